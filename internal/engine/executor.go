@@ -111,10 +111,12 @@ func Execute(ctx context.Context, cfg *config.ProjectConfig, opts ExecuteOpts) (
 
 	// Register the load_data handler for Python SDK → Go bulk load
 	sdkServer.RegisterHandler("load_data", makeLoadDataHandler(store, cfg.DAG.Name, dataDir))
+	sdkServer.RegisterStreamHandler("load_table", makeLoadTableHandler(store, cfg.DAG.Name))
 
 	// Register FTP handlers for Python SDK → Go FTP operations
-	sdkServer.RegisterHandler("ftp_list", makeFTPListHandler(store, cfg.DAG.Name))
-	sdkServer.RegisterHandler("ftp_download", makeFTPDownloadHandler(store, cfg.DAG.Name, dataDir))
+	sdkServer.RegisterValueHandler("ftp_list", makeFTPListHandler(store, cfg.DAG.Name))
+	sdkServer.RegisterValueHandler("ftp_download", makeFTPDownloadHandler(store, cfg.DAG.Name, dataDir))
+	sdkServer.RegisterResultStreamHandler("ftp_download_stream", makeFTPDownloadStreamHandler(store, cfg.DAG.Name, dataDir))
 	sdkServer.RegisterHandler("ftp_upload", makeFTPUploadHandler(store, cfg.DAG.Name, dataDir))
 	sdkServer.RegisterHandler("ftp_move", makeFTPMoveHandler(store, cfg.DAG.Name))
 
@@ -855,17 +857,9 @@ func makeLoadDataHandler(store *secrets.Store, dagName string, dataDir string) s
 			return "", fmt.Errorf("file path %q escapes data directory", fileName)
 		}
 
-		connStr, err := store.Resolve(dagName, connKey)
+		connStr, schema, err := resolveLoadTarget(store, dagName, connKey, params["schema"])
 		if err != nil {
-			return "", fmt.Errorf("resolving connection %q: %w", connKey, err)
-		}
-
-		schema := params["schema"]
-		if schema == "" {
-			driverName, _ := runner.DetectDriver(connStr)
-			if drv, drvErr := loader.GetDriver(driverName); drvErr == nil {
-				schema = drv.DefaultSchema()
-			}
+			return "", err
 		}
 
 		rows, err := loader.Load(ctx, loader.LoadParams{
@@ -883,6 +877,65 @@ func makeLoadDataHandler(store *secrets.Store, dagName string, dataDir string) s
 	}
 }
 
+// makeLoadTableHandler returns a StreamHandlerFunc that loads an Arrow IPC
+// stream sent as the request body into a database, skipping the Parquet
+// file that load_data reads.
+func makeLoadTableHandler(store *secrets.Store, dagName string) sdk.StreamHandlerFunc {
+	return func(ctx context.Context, params map[string]string, body io.Reader) (interface{}, error) {
+		table := params["table"]
+		connKey := params["connection"]
+
+		if table == "" {
+			return nil, fmt.Errorf("missing required parameter: table")
+		}
+		if connKey == "" {
+			return nil, fmt.Errorf("missing required parameter: connection")
+		}
+		if store == nil {
+			return nil, fmt.Errorf("secrets store not configured (use --secrets flag)")
+		}
+
+		mode := params["mode"]
+		if mode == "" {
+			mode = "append"
+		}
+
+		connStr, schema, err := resolveLoadTarget(store, dagName, connKey, params["schema"])
+		if err != nil {
+			return nil, err
+		}
+
+		rows, err := loader.LoadStream(ctx, loader.LoadParams{
+			Table:   table,
+			Schema:  schema,
+			Mode:    loader.LoadMode(mode),
+			ConnStr: connStr,
+		}, body)
+		if err != nil {
+			return nil, fmt.Errorf("loading data: %w", err)
+		}
+
+		return fmt.Sprintf("%d rows loaded", rows), nil
+	}
+}
+
+// resolveLoadTarget resolves a connection key to its connection string and
+// fills in the driver's default schema when none was given.
+func resolveLoadTarget(store *secrets.Store, dagName, connKey, schema string) (string, string, error) {
+	connStr, err := store.Resolve(dagName, connKey)
+	if err != nil {
+		return "", "", fmt.Errorf("resolving connection %q: %w", connKey, err)
+	}
+
+	if schema == "" {
+		driverName, _ := runner.DetectDriver(connStr)
+		if drv, drvErr := loader.GetDriver(driverName); drvErr == nil {
+			schema = drv.DefaultSchema()
+		}
+	}
+	return connStr, schema, nil
+}
+
 // resolveTaskConnection returns the connection key for a task, falling back to DAG default.
 func resolveTaskConnection(tc *config.TaskConfig, cfg *config.ProjectConfig) string {
 	if tc.Connection != "" {
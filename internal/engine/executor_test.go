@@ -1,7 +1,9 @@
 package engine
 
 import (
+	"context"
 	"path/filepath"
+	"strings"
 	"testing"
 	"time"
 
@@ -285,3 +287,32 @@ func TestParseSchemaTable(t *testing.T) {
 		}
 	}
 }
+
+func TestLoadTableHandler_MissingParams(t *testing.T) {
+	store := loadTestStore(t, `[global]
+key = "value"
+`)
+	handler := makeLoadTableHandler(store, "test")
+	ctx := context.Background()
+
+	tests := []struct {
+		name   string
+		params map[string]string
+		want   string
+	}{
+		{"missing table", map[string]string{"connection": "key"}, "table"},
+		{"missing connection", map[string]string{"table": "t"}, "connection"},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			_, err := handler(ctx, tt.params, strings.NewReader(""))
+			if err == nil {
+				t.Fatal("expected error, got nil")
+			}
+			if !strings.Contains(err.Error(), tt.want) {
+				t.Errorf("error = %q, want it to mention %q", err, tt.want)
+			}
+		})
+	}
+}
@@ -2,11 +2,12 @@ package engine
 
 import (
 	"context"
-	"encoding/json"
 	"fmt"
 	"path/filepath"
 	"strconv"
 	"strings"
+	"sync"
+	"sync/atomic"
 
 	pitftp "github.com/druarnfield/pit/internal/ftp"
 	"github.com/druarnfield/pit/internal/sdk"
@@ -51,16 +52,16 @@ func connectFTP(store *secrets.Store, dagName, secretName string) (*pitftp.Clien
 // makeFTPListHandler returns a handler that lists files on an FTP server.
 //
 // Params: secret, directory, pattern
-// Returns: JSON array of filenames
-func makeFTPListHandler(store *secrets.Store, dagName string) sdk.HandlerFunc {
-	return func(ctx context.Context, params map[string]string) (string, error) {
+// Returns: array of filenames
+func makeFTPListHandler(store *secrets.Store, dagName string) sdk.ValueHandlerFunc {
+	return func(ctx context.Context, params map[string]string) (interface{}, error) {
 		secretName := params["secret"]
 		if secretName == "" {
-			return "", fmt.Errorf("missing required parameter: secret")
+			return nil, fmt.Errorf("missing required parameter: secret")
 		}
 		directory := params["directory"]
 		if directory == "" {
-			return "", fmt.Errorf("missing required parameter: directory")
+			return nil, fmt.Errorf("missing required parameter: directory")
 		}
 		pattern := params["pattern"]
 		if pattern == "" {
@@ -69,13 +70,13 @@ func makeFTPListHandler(store *secrets.Store, dagName string) sdk.HandlerFunc {
 
 		client, err := connectFTP(store, dagName, secretName)
 		if err != nil {
-			return "", err
+			return nil, err
 		}
 		defer client.Close()
 
 		files, err := client.List(directory, pattern)
 		if err != nil {
-			return "", err
+			return nil, err
 		}
 
 		names := make([]string, len(files))
@@ -83,11 +84,7 @@ func makeFTPListHandler(store *secrets.Store, dagName string) sdk.HandlerFunc {
 			names[i] = f.Name
 		}
 
-		b, err := json.Marshal(names)
-		if err != nil {
-			return "", fmt.Errorf("encoding file list: %w", err)
-		}
-		return string(b), nil
+		return names, nil
 	}
 }
 
@@ -96,39 +93,39 @@ func makeFTPListHandler(store *secrets.Store, dagName string) sdk.HandlerFunc {
 //
 // Single file mode:   params: secret, remote_path
 // Pattern match mode: params: secret, directory, pattern
-// Returns: JSON array of local file paths (absolute, inside dataDir)
-func makeFTPDownloadHandler(store *secrets.Store, dagName string, dataDir string) sdk.HandlerFunc {
-	return func(ctx context.Context, params map[string]string) (string, error) {
+// Returns: array of local file paths (absolute, inside dataDir)
+func makeFTPDownloadHandler(store *secrets.Store, dagName string, dataDir string) sdk.ValueHandlerFunc {
+	return func(ctx context.Context, params map[string]string) (interface{}, error) {
 		secretName := params["secret"]
 		if secretName == "" {
-			return "", fmt.Errorf("missing required parameter: secret")
+			return nil, fmt.Errorf("missing required parameter: secret")
 		}
 
 		client, err := connectFTP(store, dagName, secretName)
 		if err != nil {
-			return "", err
+			return nil, err
 		}
 		defer client.Close()
 
-		var downloaded []string
+		downloaded := []string{}
 
 		if pattern := params["pattern"]; pattern != "" {
 			// Batch mode: download all matching files from a directory
 			directory := params["directory"]
 			if directory == "" {
-				return "", fmt.Errorf("missing required parameter: directory (required with pattern)")
+				return nil, fmt.Errorf("missing required parameter: directory (required with pattern)")
 			}
 
 			files, err := client.List(directory, pattern)
 			if err != nil {
-				return "", err
+				return nil, err
 			}
 
 			for _, f := range files {
 				remotePath := directory + "/" + f.Name
 				localPath := filepath.Join(dataDir, f.Name)
 				if err := client.Download(remotePath, localPath); err != nil {
-					return "", fmt.Errorf("downloading %q: %w", f.Name, err)
+					return nil, fmt.Errorf("downloading %q: %w", f.Name, err)
 				}
 				downloaded = append(downloaded, localPath)
 			}
@@ -136,7 +133,7 @@ func makeFTPDownloadHandler(store *secrets.Store, dagName string, dataDir string
 			// Single file mode
 			remotePath := params["remote_path"]
 			if remotePath == "" {
-				return "", fmt.Errorf("missing required parameter: remote_path (or use directory+pattern for batch)")
+				return nil, fmt.Errorf("missing required parameter: remote_path (or use directory+pattern for batch)")
 			}
 
 			fileName := filepath.Base(remotePath)
@@ -146,21 +143,161 @@ func makeFTPDownloadHandler(store *secrets.Store, dagName string, dataDir string
 			absLocal, _ := filepath.Abs(localPath)
 			absData, _ := filepath.Abs(dataDir)
 			if !strings.HasPrefix(absLocal, absData+string(filepath.Separator)) {
-				return "", fmt.Errorf("filename %q escapes data directory", fileName)
+				return nil, fmt.Errorf("filename %q escapes data directory", fileName)
 			}
 
 			if err := client.Download(remotePath, localPath); err != nil {
-				return "", err
+				return nil, err
 			}
 			downloaded = append(downloaded, localPath)
 		}
 
-		b, err := json.Marshal(downloaded)
+		return downloaded, nil
+	}
+}
+
+// defaultFTPConcurrency is the number of FTP sessions ftp_download_stream
+// opens when the caller does not ask for a specific number.
+const defaultFTPConcurrency = 8
+
+// makeFTPDownloadStreamHandler returns a handler that downloads all files
+// matching a pattern using a bounded pool of FTP sessions, sending each
+// local path to the client as soon as its file has landed.
+//
+// Params: secret, directory, pattern, concurrency (optional, default 8)
+// Streams: local file path per completed download (absolute, inside dataDir)
+// Returns: number of files downloaded
+func makeFTPDownloadStreamHandler(store *secrets.Store, dagName string, dataDir string) sdk.ResultStreamHandlerFunc {
+	return func(ctx context.Context, params map[string]string, send func(interface{}) error) (interface{}, error) {
+		secretName := params["secret"]
+		if secretName == "" {
+			return nil, fmt.Errorf("missing required parameter: secret")
+		}
+		directory := params["directory"]
+		if directory == "" {
+			return nil, fmt.Errorf("missing required parameter: directory")
+		}
+		pattern := params["pattern"]
+		if pattern == "" {
+			pattern = "*"
+		}
+		concurrency := defaultFTPConcurrency
+		if c := params["concurrency"]; c != "" {
+			n, err := strconv.Atoi(c)
+			if err != nil || n < 1 {
+				return nil, fmt.Errorf("invalid concurrency %q (must be a positive integer)", c)
+			}
+			concurrency = n
+		}
+
+		client, err := connectFTP(store, dagName, secretName)
 		if err != nil {
-			return "", fmt.Errorf("encoding result: %w", err)
+			return nil, err
 		}
-		return string(b), nil
+
+		files, err := client.List(directory, pattern)
+		if err != nil {
+			client.Close()
+			return nil, err
+		}
+		if len(files) == 0 {
+			client.Close()
+			return 0, nil
+		}
+
+		connect := func() (ftpSession, error) {
+			c, err := connectFTP(store, dagName, secretName)
+			if err != nil {
+				return nil, err
+			}
+			return c, nil
+		}
+		return downloadFiles(ctx, client, connect, files, concurrency, directory, dataDir, send)
+	}
+}
+
+// ftpSession is the part of an FTP client a download worker needs.
+type ftpSession interface {
+	Download(remotePath, localPath string) error
+	Close() error
+}
+
+// downloadFiles downloads files from directory into dataDir over up to
+// concurrency sessions, calling send with each local path as its file
+// lands. first is an already-connected session and always runs as a
+// worker; the rest are opened with connect. A session that fails to log in
+// (servers often cap sessions per user) just leaves the pool smaller.
+// Returns the number of files downloaded.
+func downloadFiles(ctx context.Context, first ftpSession, connect func() (ftpSession, error), files []pitftp.FileInfo, concurrency int, directory, dataDir string, send func(interface{}) error) (int64, error) {
+	ctx, cancel := context.WithCancel(ctx)
+	defer cancel()
+
+	var (
+		wg         sync.WaitGroup
+		failOnce   sync.Once
+		firstErr   error
+		downloaded atomic.Int64
+	)
+	fail := func(err error) {
+		failOnce.Do(func() {
+			firstErr = err
+			cancel()
+		})
+	}
+
+	// The extra sessions log in concurrently so their handshakes overlap
+	// with the first session's downloads.
+	jobs := make(chan pitftp.FileInfo)
+	for i := 0; i < min(concurrency, len(files)); i++ {
+		var worker ftpSession
+		if i == 0 {
+			worker = first
+		}
+		wg.Add(1)
+		go func(c ftpSession) {
+			defer wg.Done()
+			if c == nil {
+				var err error
+				if c, err = connect(); err != nil {
+					return
+				}
+			}
+			defer c.Close()
+
+			for f := range jobs {
+				localPath := filepath.Join(dataDir, f.Name)
+				if err := c.Download(directory+"/"+f.Name, localPath); err != nil {
+					fail(fmt.Errorf("downloading %q: %w", f.Name, err))
+					return
+				}
+				if err := send(localPath); err != nil {
+					fail(err)
+					return
+				}
+				downloaded.Add(1)
+			}
+		}(worker)
+	}
+
+feed:
+	for _, f := range files {
+		select {
+		case jobs <- f:
+		case <-ctx.Done():
+			break feed
+		}
+	}
+	close(jobs)
+	wg.Wait()
+
+	if firstErr != nil {
+		return 0, firstErr
+	}
+	n := downloaded.Load()
+	if n < int64(len(files)) {
+		return 0, fmt.Errorf("download cancelled after %d of %d files: %w", n, len(files), ctx.Err())
 	}
+	return n, nil
 }
 
 // makeFTPUploadHandler returns a handler that uploads a file from the data directory
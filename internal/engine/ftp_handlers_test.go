@@ -2,11 +2,14 @@ package engine
 
 import (
 	"context"
+	"fmt"
 	"os"
 	"path/filepath"
 	"strings"
+	"sync"
 	"testing"
 
+	pitftp "github.com/druarnfield/pit/internal/ftp"
 	"github.com/druarnfield/pit/internal/secrets"
 )
 
@@ -149,6 +152,42 @@ password = "pass"
 	}
 }
 
+func TestFTPDownloadStreamHandler_MissingParams(t *testing.T) {
+	store := loadTestStore(t, `[global]
+key = "value"
+`)
+	dataDir := t.TempDir()
+	handler := makeFTPDownloadStreamHandler(store, "test", dataDir)
+	ctx := context.Background()
+	send := func(interface{}) error {
+		t.Fatal("send called for an invalid request")
+		return nil
+	}
+
+	tests := []struct {
+		name   string
+		params map[string]string
+		want   string
+	}{
+		{"missing secret", map[string]string{"directory": "/data"}, "secret"},
+		{"missing directory", map[string]string{"secret": "ftp_creds"}, "directory"},
+		{"zero concurrency", map[string]string{"secret": "ftp_creds", "directory": "/data", "concurrency": "0"}, "concurrency"},
+		{"non-numeric concurrency", map[string]string{"secret": "ftp_creds", "directory": "/data", "concurrency": "lots"}, "concurrency"},
+	}
+
+	for _, tt := range tests {
+		t.Run(tt.name, func(t *testing.T) {
+			_, err := handler(ctx, tt.params, send)
+			if err == nil {
+				t.Fatal("expected error, got nil")
+			}
+			if !strings.Contains(err.Error(), tt.want) {
+				t.Errorf("error = %q, want it to mention %q", err, tt.want)
+			}
+		})
+	}
+}
+
 func TestFTPUploadHandler_MissingParams(t *testing.T) {
 	store := loadTestStore(t, `[global]
 key = "value"
@@ -233,3 +272,74 @@ key = "value"
 		})
 	}
 }
+
+// fakeSession is an ftpSession that writes each downloaded file's remote
+// path into the local file.
+type fakeSession struct {
+	fail string // remote path whose download fails
+}
+
+func (s *fakeSession) Download(remotePath, localPath string) error {
+	if remotePath == s.fail {
+		return fmt.Errorf("550 file unavailable")
+	}
+	return os.WriteFile(localPath, []byte(remotePath), 0o644)
+}
+
+func (s *fakeSession) Close() error { return nil }
+
+func TestDownloadFiles_ExtraSessionsRefused(t *testing.T) {
+	dataDir := t.TempDir()
+	files := []pitftp.FileInfo{{Name: "a.csv"}, {Name: "b.csv"}, {Name: "c.csv"}, {Name: "d.csv"}}
+
+	// The server refuses every session beyond the first
+	connect := func() (ftpSession, error) {
+		return nil, fmt.Errorf("421 too many connections")
+	}
+
+	var mu sync.Mutex
+	var sent []string
+	send := func(result interface{}) error {
+		mu.Lock()
+		defer mu.Unlock()
+		sent = append(sent, result.(string))
+		return nil
+	}
+
+	n, err := downloadFiles(context.Background(), &fakeSession{}, connect, files, 8, "/in", dataDir, send)
+	if err != nil {
+		t.Fatalf("downloadFiles() unexpected error: %v", err)
+	}
+	if n != int64(len(files)) {
+		t.Errorf("downloaded = %d, want %d", n, len(files))
+	}
+	if len(sent) != len(files) {
+		t.Errorf("sent %d paths, want %d", len(sent), len(files))
+	}
+	for _, f := range files {
+		data, err := os.ReadFile(filepath.Join(dataDir, f.Name))
+		if err != nil {
+			t.Fatalf("reading %s: %v", f.Name, err)
+		}
+		if string(data) != "/in/"+f.Name {
+			t.Errorf("%s content = %q, want %q", f.Name, data, "/in/"+f.Name)
+		}
+	}
+}
+
+func TestDownloadFiles_DownloadError(t *testing.T) {
+	dataDir := t.TempDir()
+	files := []pitftp.FileInfo{{Name: "a.csv"}, {Name: "b.csv"}, {Name: "c.csv"}}
+	connect := func() (ftpSession, error) {
+		return &fakeSession{fail: "/in/b.csv"}, nil
+	}
+	send := func(interface{}) error { return nil }
+
+	_, err := downloadFiles(context.Background(), &fakeSession{fail: "/in/b.csv"}, connect, files, 2, "/in", dataDir, send)
+	if err == nil {
+		t.Fatal("downloadFiles() expected error, got nil")
+	}
+	if !strings.Contains(err.Error(), "b.csv") {
+		t.Errorf("error = %q, want it to mention %q", err, "b.csv")
+	}
+}
@@ -10,7 +10,7 @@ import (
 
 // Driver abstracts database-specific bulk load and DDL operations.
 type Driver interface {
-	BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream *parquetStream) (int64, error)
+	BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream recordStream) (int64, error)
 	CreateTable(ctx context.Context, db *sql.DB, schema, table string, arrowSchema *arrow.Schema) error
 	DropTable(ctx context.Context, db *sql.DB, schema, table string) error
 	TruncateTable(ctx context.Context, db *sql.DB, schema, table string) error
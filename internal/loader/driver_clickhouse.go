@@ -197,7 +197,7 @@ func (d *ClickHouseDriver) TruncateTable(ctx context.Context, db *sql.DB, schema
 // BulkLoad streams Arrow record batches into a ClickHouse table using batch inserts.
 // The clickhouse-go driver accumulates rows in the prepared statement and sends them
 // as a batch on tx.Commit().
-func (d *ClickHouseDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream *parquetStream) (int64, error) {
+func (d *ClickHouseDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream recordStream) (int64, error) {
 	schema := stream.Schema()
 
 	// Build column names and INSERT statement.
@@ -252,7 +252,7 @@ func (d *ClickHouseDriver) BulkLoad(ctx context.Context, db *sql.DB, params Load
 		totalRows += int64(numRows)
 	}
 	if err := stream.Err(); err != nil {
-		return totalRows, fmt.Errorf("reading parquet: %w", err)
+		return totalRows, fmt.Errorf("reading records: %w", err)
 	}
 
 	if err := tx.Commit(); err != nil {
@@ -140,9 +140,9 @@ func (d *MSSQLDriver) TruncateTable(ctx context.Context, db *sql.DB, schema, tab
 	return nil
 }
 
-// BulkLoad streams Arrow record batches from the parquetStream into an MSSQL table.
-// Only one row group's worth of data is held in memory at a time.
-func (d *MSSQLDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream *parquetStream) (int64, error) {
+// BulkLoad streams Arrow record batches from the recordStream into an MSSQL table.
+// Only one batch (or Parquet row group) of data is held in memory at a time.
+func (d *MSSQLDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream recordStream) (int64, error) {
 	schema := stream.Schema()
 
 	// Build column names from Arrow schema
@@ -189,7 +189,7 @@ func (d *MSSQLDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParam
 		totalRows += int64(numRows)
 	}
 	if err := stream.Err(); err != nil {
-		return totalRows, fmt.Errorf("reading parquet: %w", err)
+		return totalRows, fmt.Errorf("reading records: %w", err)
 	}
 
 	// Flush the bulk copy
@@ -149,7 +149,7 @@ func (d *OracleDriver) TruncateTable(ctx context.Context, db *sql.DB, schema, ta
 
 // BulkLoad streams Arrow record batches into an Oracle table using prepared statements
 // with Oracle bind variables (:1, :2, ...) within a transaction.
-func (d *OracleDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream *parquetStream) (int64, error) {
+func (d *OracleDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream recordStream) (int64, error) {
 	schema := stream.Schema()
 
 	// Build column names and bind placeholders
@@ -201,7 +201,7 @@ func (d *OracleDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadPara
 		totalRows += int64(numRows)
 	}
 	if err := stream.Err(); err != nil {
-		return totalRows, fmt.Errorf("reading parquet: %w", err)
+		return totalRows, fmt.Errorf("reading records: %w", err)
 	}
 
 	if err := txn.Commit(); err != nil {
@@ -137,7 +137,7 @@ func (d *PostgresDriver) TruncateTable(ctx context.Context, db *sql.DB, schema,
 // BulkLoad streams Arrow record batches into a PostgreSQL table using pgx COPY protocol.
 // It opens a separate pgx native connection for the COPY operation (the db *sql.DB param
 // is used by the shared Load() caller for DDL but is not needed here).
-func (d *PostgresDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream *parquetStream) (int64, error) {
+func (d *PostgresDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadParams, stream recordStream) (int64, error) {
 	schema := stream.Schema()
 
 	colNames := make([]string, schema.NumFields())
@@ -182,7 +182,7 @@ func (d *PostgresDriver) BulkLoad(ctx context.Context, db *sql.DB, params LoadPa
 		totalRows += copied
 	}
 	if err := stream.Err(); err != nil {
-		return totalRows, fmt.Errorf("reading parquet: %w", err)
+		return totalRows, fmt.Errorf("reading records: %w", err)
 	}
 
 	return totalRows, nil
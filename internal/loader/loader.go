@@ -1,10 +1,16 @@
 package loader
 
 import (
+	"bufio"
 	"context"
 	"database/sql"
 	"fmt"
+	"io"
+	"os"
 
+	"github.com/apache/arrow-go/v18/arrow"
+	"github.com/apache/arrow-go/v18/arrow/ipc"
+	"github.com/apache/arrow-go/v18/arrow/memory"
 	"github.com/druarnfield/pit/internal/runner"
 )
 
@@ -19,25 +25,111 @@ const (
 
 // LoadParams configures a data load operation.
 type LoadParams struct {
-	FilePath string   // path to the Parquet file
+	FilePath string   // path to the Parquet file (unused by LoadStream)
 	Table    string   // target table name
 	Schema   string   // target schema (default depends on driver)
 	Mode     LoadMode // append, truncate_and_load, or create_or_replace
 	ConnStr  string   // database connection string
 }
 
+// recordStream is a forward-only sequence of Arrow record batches that a
+// Driver bulk-loads. It is satisfied by parquetStream (a Parquet file read
+// one row group at a time) and by *ipc.Reader (an Arrow IPC stream).
+// Each Record is valid until the next call to Next.
+type recordStream interface {
+	Schema() *arrow.Schema
+	Next() bool
+	Record() arrow.Record
+	Err() error
+}
+
+var (
+	_ recordStream = (*parquetStream)(nil)
+	_ recordStream = (*ipc.Reader)(nil)
+)
+
 // Load reads a Parquet file and bulk-loads it into the target database.
 // Data is streamed one row group at a time to keep memory usage steady.
 // Returns the number of rows loaded.
 func Load(ctx context.Context, params LoadParams) (int64, error) {
+	drv, driverName, err := prepareLoad(&params)
+	if err != nil {
+		return 0, err
+	}
+
+	stream, err := openParquetStream(ctx, params.FilePath)
+	if err != nil {
+		return 0, fmt.Errorf("reading parquet file: %w", err)
+	}
+	defer stream.Close()
+
+	return load(ctx, drv, driverName, params, stream)
+}
+
+// LoadStream reads an Arrow IPC stream from r and bulk-loads it into the
+// target database. params.FilePath is ignored. Returns the number of rows
+// loaded.
+//
+// In append mode record batches are loaded as they arrive, so only one batch
+// is held in memory at a time; if r fails part-way, the rows loaded so far
+// stay in the table. The create_or_replace and truncate_and_load modes first
+// spool the whole stream to a temporary file, so a sender that aborts
+// mid-stream never leaves the table dropped or emptied.
+func LoadStream(ctx context.Context, params LoadParams, r io.Reader) (int64, error) {
+	drv, driverName, err := prepareLoad(&params)
+	if err != nil {
+		return 0, err
+	}
+
+	if params.Mode != ModeAppend {
+		f, err := spool(r)
+		if err != nil {
+			return 0, fmt.Errorf("buffering arrow stream: %w", err)
+		}
+		defer os.Remove(f.Name())
+		defer f.Close()
+		r = bufio.NewReader(f)
+	}
+
+	stream, err := ipc.NewReader(r, ipc.WithAllocator(memory.DefaultAllocator))
+	if err != nil {
+		return 0, fmt.Errorf("reading arrow stream: %w", err)
+	}
+	defer stream.Release()
+
+	return load(ctx, drv, driverName, params, stream)
+}
+
+// spool copies r to a temporary file and returns it rewound to the start.
+func spool(r io.Reader) (*os.File, error) {
+	f, err := os.CreateTemp("", "pit-load-*.arrows")
+	if err != nil {
+		return nil, err
+	}
+	if _, err := io.Copy(f, r); err != nil {
+		f.Close()
+		os.Remove(f.Name())
+		return nil, err
+	}
+	if _, err := f.Seek(0, io.SeekStart); err != nil {
+		f.Close()
+		os.Remove(f.Name())
+		return nil, err
+	}
+	return f, nil
+}
+
+// prepareLoad resolves the driver for params and fills in the default
+// schema and mode, rejecting unsupported modes.
+func prepareLoad(params *LoadParams) (Driver, string, error) {
 	driverName, err := runner.DetectDriver(params.ConnStr)
 	if err != nil {
-		return 0, fmt.Errorf("detecting driver: %w", err)
+		return nil, "", fmt.Errorf("detecting driver: %w", err)
 	}
 
 	drv, err := GetDriver(driverName)
 	if err != nil {
-		return 0, fmt.Errorf("getting driver: %w", err)
+		return nil, "", fmt.Errorf("getting driver: %w", err)
 	}
 
 	if params.Schema == "" {
@@ -50,15 +142,14 @@ func Load(ctx context.Context, params LoadParams) (int64, error) {
 	case ModeAppend, ModeTruncateAndLoad, ModeCreateOrReplace:
 		// valid
 	default:
-		return 0, fmt.Errorf("unsupported load mode %q (must be append, truncate_and_load, or create_or_replace)", params.Mode)
+		return nil, "", fmt.Errorf("unsupported load mode %q (must be append, truncate_and_load, or create_or_replace)", params.Mode)
 	}
 
-	stream, err := openParquetStream(ctx, params.FilePath)
-	if err != nil {
-		return 0, fmt.Errorf("reading parquet file: %w", err)
-	}
-	defer stream.Close()
+	return drv, driverName, nil
+}
 
+// load applies the load mode's DDL and bulk-loads stream into the target table.
+func load(ctx context.Context, drv Driver, driverName string, params LoadParams, stream recordStream) (int64, error) {
 	db, err := sql.Open(driverName, params.ConnStr)
 	if err != nil {
 		return 0, fmt.Errorf("opening database connection: %w", err)
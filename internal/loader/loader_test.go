@@ -2,9 +2,12 @@ package loader
 
 import (
 	"fmt"
+	"io"
 	"os"
 	"path/filepath"
+	"strings"
 	"testing"
+	"testing/iotest"
 	"time"
 
 	"github.com/apache/arrow-go/v18/arrow"
@@ -363,6 +366,40 @@ func TestLoadParams_Defaults(t *testing.T) {
 	}
 }
 
+func TestLoadStream_InvalidStream(t *testing.T) {
+	// A body that is not an Arrow IPC stream must be rejected before any
+	// database connection is attempted.
+	_, err := LoadStream(t.Context(), LoadParams{
+		Table:   "test_table",
+		ConnStr: "sqlserver://localhost",
+	}, strings.NewReader("not an arrow stream"))
+	if err == nil {
+		t.Fatal("LoadStream() expected error for invalid stream, got nil")
+	}
+	expected := "reading arrow stream"
+	if got := fmt.Sprintf("%v", err); !containsStr(got, expected) {
+		t.Errorf("error = %q, want it to contain %q", got, expected)
+	}
+}
+
+func TestLoadStream_DestructiveModeTruncatedBody(t *testing.T) {
+	// A body that fails part-way must be rejected before create_or_replace
+	// touches the database.
+	body := io.MultiReader(strings.NewReader("partial"), iotest.ErrReader(io.ErrUnexpectedEOF))
+	_, err := LoadStream(t.Context(), LoadParams{
+		Table:   "test_table",
+		Mode:    ModeCreateOrReplace,
+		ConnStr: "sqlserver://localhost",
+	}, body)
+	if err == nil {
+		t.Fatal("LoadStream() expected error for truncated body, got nil")
+	}
+	expected := "buffering arrow stream"
+	if got := fmt.Sprintf("%v", err); !containsStr(got, expected) {
+		t.Errorf("error = %q, want it to contain %q", got, expected)
+	}
+}
+
 func containsStr(s, substr string) bool {
 	for i := 0; i <= len(s)-len(substr); i++ {
 		if s[i:i+len(substr)] == substr {
@@ -1,30 +1,83 @@
 package sdk
 
 import (
+	"bufio"
 	"context"
+	"encoding/binary"
 	"encoding/json"
+	"errors"
 	"fmt"
+	"io"
 	"net"
 	"os"
 	"runtime"
 	"sync"
+	"time"
 )
 
+// maxFrameSize caps the payload of a single request frame. Requests carry
+// only a method name and string params, so anything larger is treated as
+// a protocol error rather than allocated.
+const maxFrameSize = 16 << 20
+
+// errFrameTooLarge is returned by readFrame when a frame header announces
+// a payload larger than maxFrameSize.
+var errFrameTooLarge = errors.New("frame exceeds size limit")
+
+// errStreamClosed is returned by a result stream's send function once its
+// handler has returned.
+var errStreamClosed = errors.New("result stream closed")
+
 // Request is the JSON message sent by a task to the SDK server.
+// Like Response, it is framed with a 4-byte big-endian payload length, so
+// a client can keep one connection open and pipeline many requests on it.
+//
+// When Stream is set, the request frame is followed by a body sent as a
+// sequence of frames and terminated by a zero-length frame. The body is
+// handed to the method's StreamHandlerFunc as an io.Reader, so bulk data
+// (e.g. an Arrow IPC stream) can ride the same connection without a
+// second socket or an intermediate file.
 type Request struct {
 	Method string            `json:"method"`
 	Params map[string]string `json:"params"`
+	Stream bool              `json:"stream,omitempty"`
 }
 
 // Response is the JSON reply from the SDK server to a task.
+// It is written as a single frame: a 4-byte big-endian payload length
+// followed by the JSON-encoded response (see writeResponse).
+// Result is usually a string, but handlers registered with
+// RegisterValueHandler may return any JSON-encodable value (e.g. a list of
+// filenames), which clients receive already decoded.
+//
+// Methods registered with RegisterResultStreamHandler answer with a run of
+// record responses, each with More set, followed by one final response.
 type Response struct {
-	Result string `json:"result"`
-	Error  string `json:"error,omitempty"`
+	Result interface{} `json:"result"`
+	Error  string      `json:"error,omitempty"`
+	More   bool        `json:"more,omitempty"`
 }
 
 // HandlerFunc processes an SDK request and returns a result or error string.
 type HandlerFunc func(ctx context.Context, params map[string]string) (string, error)
 
+// ValueHandlerFunc processes an SDK request and returns a JSON-encodable
+// result. It is encoded inline in the response rather than as a string.
+type ValueHandlerFunc func(ctx context.Context, params map[string]string) (interface{}, error)
+
+// StreamHandlerFunc processes an SDK request that carries a streamed body.
+// body yields the concatenated body frames and returns io.EOF at the
+// terminator. Any part of the body the handler leaves unread is discarded
+// before the response is sent.
+type StreamHandlerFunc func(ctx context.Context, params map[string]string, body io.Reader) (interface{}, error)
+
+// ResultStreamHandlerFunc processes an SDK request whose results are sent
+// back one at a time as they become available. Each call to send writes a
+// record to the client immediately; send is safe for concurrent use and
+// must not be called after the handler returns. The handler's own return
+// value becomes the final response.
+type ResultStreamHandlerFunc func(ctx context.Context, params map[string]string, send func(result interface{}) error) (interface{}, error)
+
 // SecretsResolver resolves secrets by project scope.
 type SecretsResolver interface {
 	Resolve(project, key string) (string, error)
@@ -38,11 +91,15 @@ type Server struct {
 	socketPath string // non-empty only for Unix sockets (for cleanup)
 	addr       string // connection address: socket path (Unix) or host:port (Windows)
 	dagName    string
-	handlers   map[string]HandlerFunc
+	handlers   map[string]ValueHandlerFunc
+	streams    map[string]StreamHandlerFunc
+	results    map[string]ResultStreamHandlerFunc
 	wg         sync.WaitGroup
 
 	mu       sync.Mutex
-	serveCtx context.Context // set by Serve(), passed to handlers
+	serveCtx context.Context   // set by Serve(), passed to handlers
+	conns    map[net.Conn]bool // open client connections; true while a request body is streaming
+	draining bool              // set once shutdown has started
 }
 
 // NewServer creates a socket listener and registers the default handlers.
@@ -59,18 +116,21 @@ func NewServer(socketPath string, store SecretsResolver, dagName string) (*Serve
 		socketPath: socketPath,
 		addr:       addr,
 		dagName:    dagName,
-		handlers:   make(map[string]HandlerFunc),
+		handlers:   make(map[string]ValueHandlerFunc),
+		streams:    make(map[string]StreamHandlerFunc),
+		results:    make(map[string]ResultStreamHandlerFunc),
+		conns:      make(map[net.Conn]bool),
 	}
 
 	if store != nil {
-		s.handlers["get_secret"] = func(_ context.Context, params map[string]string) (string, error) {
+		s.RegisterHandler("get_secret", func(_ context.Context, params map[string]string) (string, error) {
 			key := params["key"]
 			if key == "" {
 				return "", fmt.Errorf("missing required parameter: key")
 			}
 			return store.Resolve(dagName, key)
-		}
-		s.handlers["get_secret_field"] = func(_ context.Context, params map[string]string) (string, error) {
+		})
+		s.RegisterHandler("get_secret_field", func(_ context.Context, params map[string]string) (string, error) {
 			secret := params["secret"]
 			if secret == "" {
 				return "", fmt.Errorf("missing required parameter: secret")
@@ -80,7 +140,7 @@ func NewServer(socketPath string, store SecretsResolver, dagName string) (*Serve
 				return "", fmt.Errorf("missing required parameter: field")
 			}
 			return store.ResolveField(dagName, secret, field)
-		}
+		})
 	}
 
 	return s, nil
@@ -88,7 +148,30 @@ func NewServer(socketPath string, store SecretsResolver, dagName string) (*Serve
 
 // RegisterHandler adds or replaces a method handler on the server.
 func (s *Server) RegisterHandler(method string, handler HandlerFunc) {
+	s.RegisterValueHandler(method, func(ctx context.Context, params map[string]string) (interface{}, error) {
+		return handler(ctx, params)
+	})
+}
+
+// RegisterValueHandler adds or replaces a method handler whose result is
+// sent as a native JSON value instead of a pre-encoded string.
+func (s *Server) RegisterValueHandler(method string, handler ValueHandlerFunc) {
 	s.handlers[method] = handler
+	delete(s.results, method)
+}
+
+// RegisterStreamHandler adds or replaces a handler for requests that carry
+// a streamed body (Request.Stream). Stream methods are looked up separately
+// from plain ones, so a method name may be registered as both.
+func (s *Server) RegisterStreamHandler(method string, handler StreamHandlerFunc) {
+	s.streams[method] = handler
+}
+
+// RegisterResultStreamHandler adds or replaces a method handler that
+// streams its results back as record responses (see ResultStreamHandlerFunc).
+func (s *Server) RegisterResultStreamHandler(method string, handler ResultStreamHandlerFunc) {
+	s.results[method] = handler
+	delete(s.handlers, method)
 }
 
 // listen creates a platform-appropriate network listener.
@@ -126,6 +209,7 @@ func (s *Server) Serve(ctx context.Context) error {
 	go func() {
 		<-ctx.Done()
 		s.listener.Close()
+		s.drainConns()
 	}()
 
 	for {
@@ -151,6 +235,7 @@ func (s *Server) Serve(ctx context.Context) error {
 // Shutdown closes the listener, waits for in-flight connections, and removes the socket file.
 func (s *Server) Shutdown() error {
 	err := s.listener.Close()
+	s.drainConns()
 	s.wg.Wait()
 	if s.socketPath != "" && runtime.GOOS != "windows" {
 		os.Remove(s.socketPath)
@@ -158,22 +243,58 @@ func (s *Server) Shutdown() error {
 	return err
 }
 
-func (s *Server) handleConn(conn net.Conn) {
-	defer conn.Close()
+// drainConns unblocks every idle client connection so its handler returns
+// once any in-flight request has been answered. Clients keep their
+// connection open for the life of the task, so without this Shutdown would
+// wait on processes that never hang up. Connections still receiving a
+// request body are left alone until the body ends (see setStreaming).
+func (s *Server) drainConns() {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.draining = true
+	for conn, streaming := range s.conns {
+		if !streaming {
+			conn.SetReadDeadline(time.Now())
+		}
+	}
+}
 
-	var req Request
-	if err := json.NewDecoder(conn).Decode(&req); err != nil {
-		resp := Response{Error: fmt.Sprintf("invalid request: %v", err)}
-		json.NewEncoder(conn).Encode(resp)
-		return
+// trackConn registers conn so drainConns can reach it. Connections accepted
+// after shutdown has started are drained immediately.
+func (s *Server) trackConn(conn net.Conn) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.conns[conn] = false
+	if s.draining {
+		conn.SetReadDeadline(time.Now())
 	}
+}
 
-	handler, ok := s.handlers[req.Method]
-	if !ok {
-		resp := Response{Error: fmt.Sprintf("unknown method: %s", req.Method)}
-		json.NewEncoder(conn).Encode(resp)
-		return
+func (s *Server) untrackConn(conn net.Conn) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	delete(s.conns, conn)
+}
+
+// setStreaming marks whether conn is in the middle of a request body, so
+// drainConns does not cut the body short. A connection that finishes its
+// body after shutdown has started is drained at that point.
+func (s *Server) setStreaming(conn net.Conn, streaming bool) {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.conns[conn] = streaming
+	if !streaming && s.draining {
+		conn.SetReadDeadline(time.Now())
 	}
+}
+
+// handleConn serves framed requests on conn until the client hangs up.
+// Responses are buffered and flushed once no further pipelined requests are
+// waiting, so a batch of N requests is answered with a single write.
+func (s *Server) handleConn(conn net.Conn) {
+	defer conn.Close()
+	s.trackConn(conn)
+	defer s.untrackConn(conn)
 
 	s.mu.Lock()
 	ctx := s.serveCtx
@@ -182,12 +303,198 @@ func (s *Server) handleConn(conn net.Conn) {
 		ctx = context.Background()
 	}
 
+	r := bufio.NewReader(conn)
+	w := bufio.NewWriter(conn)
+	for {
+		payload, err := readFrame(r)
+		if err != nil {
+			// EOF, a drained connection, or a truncated frame just ends the
+			// session; an oversized frame gets an error reply first.
+			if errors.Is(err, errFrameTooLarge) {
+				writeResponse(w, Response{Error: fmt.Sprintf("invalid request: %v", err)})
+				w.Flush()
+			}
+			return
+		}
+
+		var resp Response
+		var req Request
+		if err := json.Unmarshal(payload, &req); err != nil {
+			resp = Response{Error: fmt.Sprintf("invalid request: %v", err)}
+		} else if req.Stream {
+			// The body must be consumed up to its terminator whatever the
+			// handler does, or the next request would be read from the
+			// middle of it. A body that cannot be drained ends the session.
+			s.setStreaming(conn, true)
+			body := &bodyReader{r: r}
+			resp = s.dispatchStream(ctx, req, body)
+			_, err := io.Copy(io.Discard, body)
+			s.setStreaming(conn, false)
+			if err != nil {
+				return
+			}
+		} else if handler, ok := s.results[req.Method]; ok {
+			var sendErr error
+			resp, sendErr = s.dispatchResults(ctx, req, handler, w)
+			if sendErr != nil {
+				return
+			}
+		} else {
+			resp = s.dispatch(ctx, req)
+		}
+
+		if err := writeResponse(w, resp); err != nil {
+			return
+		}
+		if r.Buffered() == 0 {
+			if err := w.Flush(); err != nil {
+				return
+			}
+		}
+	}
+}
+
+// dispatch runs the handler registered for req.Method.
+func (s *Server) dispatch(ctx context.Context, req Request) Response {
+	handler, ok := s.handlers[req.Method]
+	if !ok {
+		return Response{Error: fmt.Sprintf("unknown method: %s", req.Method)}
+	}
+
 	result, err := handler(ctx, req.Params)
-	var resp Response
 	if err != nil {
-		resp.Error = err.Error()
-	} else {
-		resp.Result = result
+		return Response{Error: err.Error()}
+	}
+	return Response{Result: result}
+}
+
+// dispatchStream runs the stream handler registered for req.Method.
+func (s *Server) dispatchStream(ctx context.Context, req Request, body io.Reader) Response {
+	handler, ok := s.streams[req.Method]
+	if !ok {
+		return Response{Error: fmt.Sprintf("unknown method: %s", req.Method)}
+	}
+
+	result, err := handler(ctx, req.Params, body)
+	if err != nil {
+		return Response{Error: err.Error()}
+	}
+	return Response{Result: result}
+}
+
+// dispatchResults runs a result stream handler, writing and flushing each
+// record to w as the handler sends it. A non-nil error means a record could
+// not be written and the connection is no longer usable.
+func (s *Server) dispatchResults(ctx context.Context, req Request, handler ResultStreamHandlerFunc, w *bufio.Writer) (Response, error) {
+	var mu sync.Mutex
+	var sendErr error
+	send := func(result interface{}) error {
+		mu.Lock()
+		defer mu.Unlock()
+		if sendErr != nil {
+			return sendErr
+		}
+		if err := writeResponse(w, Response{Result: result, More: true}); err != nil {
+			sendErr = err
+		} else if err := w.Flush(); err != nil {
+			sendErr = err
+		}
+		return sendErr
+	}
+
+	result, err := handler(ctx, req.Params, send)
+
+	// Late sends from goroutines the handler failed to wait for must not
+	// interleave with the next response.
+	mu.Lock()
+	writeErr := sendErr
+	sendErr = errStreamClosed
+	mu.Unlock()
+	if writeErr != nil {
+		return Response{}, writeErr
+	}
+	if err != nil {
+		return Response{Error: err.Error()}, nil
 	}
-	json.NewEncoder(conn).Encode(resp)
+	return Response{Result: result}, nil
+}
+
+// bodyReader presents the frames of a streamed request body as a single
+// io.Reader. Chunk payloads are read straight from the connection buffer
+// into the caller's slice; a zero-length frame ends the body with io.EOF.
+type bodyReader struct {
+	r         io.Reader
+	remaining uint32 // unread bytes in the current chunk
+	err       error  // sticky; io.EOF once the terminator has been read
+}
+
+func (b *bodyReader) Read(p []byte) (int, error) {
+	for b.remaining == 0 {
+		if b.err != nil {
+			return 0, b.err
+		}
+		var hdr [4]byte
+		if _, err := io.ReadFull(b.r, hdr[:]); err != nil {
+			if err == io.EOF {
+				err = io.ErrUnexpectedEOF
+			}
+			b.err = err
+			return 0, err
+		}
+		size := binary.BigEndian.Uint32(hdr[:])
+		if size == 0 {
+			b.err = io.EOF
+			return 0, io.EOF
+		}
+		if size > maxFrameSize {
+			b.err = fmt.Errorf("%w: %d bytes (max %d)", errFrameTooLarge, size, maxFrameSize)
+			return 0, b.err
+		}
+		b.remaining = size
+	}
+
+	if uint32(len(p)) > b.remaining {
+		p = p[:b.remaining]
+	}
+	n, err := b.r.Read(p)
+	b.remaining -= uint32(n)
+	if err == io.EOF {
+		err = io.ErrUnexpectedEOF
+	}
+	if err != nil {
+		b.err = err
+	}
+	return n, err
+}
+
+// readFrame reads one length-prefixed frame and returns its payload.
+func readFrame(r io.Reader) ([]byte, error) {
+	var hdr [4]byte
+	if _, err := io.ReadFull(r, hdr[:]); err != nil {
+		return nil, err
+	}
+	size := binary.BigEndian.Uint32(hdr[:])
+	if size > maxFrameSize {
+		return nil, fmt.Errorf("%w: %d bytes (max %d)", errFrameTooLarge, size, maxFrameSize)
+	}
+	payload := make([]byte, size)
+	if _, err := io.ReadFull(r, payload); err != nil {
+		return nil, err
+	}
+	return payload, nil
+}
+
+// writeResponse writes resp to w as a length-prefixed frame: a 4-byte
+// big-endian payload length followed by the JSON payload. The length prefix
+// lets clients read the whole response into one preallocated buffer.
+func writeResponse(w io.Writer, resp Response) error {
+	payload, err := json.Marshal(resp)
+	if err != nil {
+		return fmt.Errorf("encoding response: %w", err)
+	}
+	frame := make([]byte, 4+len(payload))
+	binary.BigEndian.PutUint32(frame, uint32(len(payload)))
+	copy(frame[4:], payload)
+	_, err = w.Write(frame)
+	return err
 }
@@ -2,8 +2,10 @@ package sdk
 
 import (
 	"context"
+	"encoding/binary"
 	"encoding/json"
 	"fmt"
+	"io"
 	"net"
 	"path/filepath"
 	"runtime"
@@ -106,12 +108,52 @@ func sendRequest(t *testing.T, addr string, req Request) Response {
 	}
 	defer conn.Close()
 
-	if err := json.NewEncoder(conn).Encode(req); err != nil {
+	writeRequest(t, conn, req)
+	return readResponse(t, conn)
+}
+
+// writeRequest writes req to conn as a single length-prefixed frame.
+func writeRequest(t *testing.T, conn net.Conn, req Request) {
+	t.Helper()
+	if _, err := conn.Write(encodeFrame(t, req)); err != nil {
+		t.Fatalf("writing request: %v", err)
+	}
+}
+
+// encodeFrame JSON-encodes v and prefixes it with its 4-byte big-endian length.
+func encodeFrame(t *testing.T, v interface{}) []byte {
+	t.Helper()
+	payload, err := json.Marshal(v)
+	if err != nil {
 		t.Fatalf("encoding request: %v", err)
 	}
+	frame := make([]byte, 4+len(payload))
+	binary.BigEndian.PutUint32(frame, uint32(len(payload)))
+	copy(frame[4:], payload)
+	return frame
+}
+
+// sendRequestOn sends req on an existing connection and reads its response.
+func sendRequestOn(t *testing.T, conn net.Conn, req Request) Response {
+	t.Helper()
+	writeRequest(t, conn, req)
+	return readResponse(t, conn)
+}
+
+// readResponse reads a single length-prefixed response frame from conn.
+func readResponse(t *testing.T, conn net.Conn) Response {
+	t.Helper()
+	var hdr [4]byte
+	if _, err := io.ReadFull(conn, hdr[:]); err != nil {
+		t.Fatalf("reading response header: %v", err)
+	}
+	payload := make([]byte, binary.BigEndian.Uint32(hdr[:]))
+	if _, err := io.ReadFull(conn, payload); err != nil {
+		t.Fatalf("reading response payload: %v", err)
+	}
 
 	var resp Response
-	if err := json.NewDecoder(conn).Decode(&resp); err != nil {
+	if err := json.Unmarshal(payload, &resp); err != nil {
 		t.Fatalf("decoding response: %v", err)
 	}
 	return resp
@@ -194,19 +236,50 @@ func TestMalformedJSON(t *testing.T) {
 	}
 	defer conn.Close()
 
-	// Send invalid JSON
-	conn.Write([]byte("not json at all\n"))
+	// Send a well-framed payload that is not JSON
+	payload := []byte("not json at all")
+	frame := make([]byte, 4+len(payload))
+	binary.BigEndian.PutUint32(frame, uint32(len(payload)))
+	copy(frame[4:], payload)
+	conn.Write(frame)
 
-	var resp Response
-	if err := json.NewDecoder(conn).Decode(&resp); err != nil {
-		t.Fatalf("decoding response: %v", err)
-	}
+	resp := readResponse(t, conn)
 	if resp.Error == "" {
 		t.Error("expected error for malformed JSON, got none")
 	}
 	if !strings.Contains(resp.Error, "invalid request") {
 		t.Errorf("error = %q, want it to contain 'invalid request'", resp.Error)
 	}
+
+	// Frame boundaries are intact, so the connection stays usable
+	resp = sendRequestOn(t, conn, Request{Method: "bogus_method"})
+	if !strings.Contains(resp.Error, "unknown method") {
+		t.Errorf("error after malformed request = %q, want 'unknown method'", resp.Error)
+	}
+}
+
+func TestOversizedFrame(t *testing.T) {
+	store := &mockStore{data: map[string]map[string]string{}}
+	sockPath, _ := startTestServer(t, store, "my_dag")
+
+	conn, err := net.Dial(testNetwork(), sockPath)
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+
+	// Unframed text: the first four bytes decode as a huge length
+	conn.Write([]byte("not json at all\n"))
+
+	resp := readResponse(t, conn)
+	if !strings.Contains(resp.Error, "invalid request") {
+		t.Errorf("error = %q, want it to contain 'invalid request'", resp.Error)
+	}
+
+	// The server drops the connection after a framing error
+	if _, err := conn.Read(make([]byte, 1)); err != io.EOF {
+		t.Errorf("read after framing error = %v, want io.EOF", err)
+	}
 }
 
 func TestContextCancellation(t *testing.T) {
@@ -304,6 +377,55 @@ func TestRegisterHandler(t *testing.T) {
 	}
 }
 
+func TestRegisterValueHandler(t *testing.T) {
+	sockPath := filepath.Join(t.TempDir(), "test.sock")
+	srv, err := NewServer(sockPath, nil, "test")
+	if err != nil {
+		t.Fatalf("NewServer() unexpected error: %v", err)
+	}
+
+	srv.RegisterValueHandler("list", func(_ context.Context, params map[string]string) (interface{}, error) {
+		return []string{"a.csv", "b.csv"}, nil
+	})
+
+	ctx, cancel := context.WithCancel(context.Background())
+	go srv.Serve(ctx)
+
+	network := testNetwork()
+	addr := srv.Addr()
+	var conn net.Conn
+	for i := 0; i < 50; i++ {
+		conn, err = net.Dial(network, addr)
+		if err == nil {
+			break
+		}
+		time.Sleep(10 * time.Millisecond)
+	}
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+	t.Cleanup(func() {
+		cancel()
+		srv.Shutdown()
+	})
+
+	writeRequest(t, conn, Request{Method: "list"})
+	var hdr [4]byte
+	if _, err := io.ReadFull(conn, hdr[:]); err != nil {
+		t.Fatalf("reading response header: %v", err)
+	}
+	payload := make([]byte, binary.BigEndian.Uint32(hdr[:]))
+	if _, err := io.ReadFull(conn, payload); err != nil {
+		t.Fatalf("reading response payload: %v", err)
+	}
+
+	want := `{"result":["a.csv","b.csv"]}`
+	if string(payload) != want {
+		t.Errorf("response = %s, want %s", payload, want)
+	}
+}
+
 func TestNewServer_NilStore(t *testing.T) {
 	sockPath := filepath.Join(t.TempDir(), "test.sock")
 	srv, err := NewServer(sockPath, nil, "test")
@@ -406,3 +528,286 @@ func TestGetSecretField_MissingParams(t *testing.T) {
 		t.Errorf("error = %q, want it to mention 'field'", resp.Error)
 	}
 }
+
+func TestResponseFraming(t *testing.T) {
+	store := &mockStore{data: map[string]map[string]string{
+		"my_dag": {"db_conn": "Server=localhost;Database=test"},
+	}}
+	sockPath, _ := startTestServer(t, store, "my_dag")
+
+	conn, err := net.Dial(testNetwork(), sockPath)
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+
+	writeRequest(t, conn, Request{
+		Method: "get_secret",
+		Params: map[string]string{"key": "db_conn"},
+	})
+	if err := conn.(interface{ CloseWrite() error }).CloseWrite(); err != nil {
+		t.Fatalf("closing write side: %v", err)
+	}
+
+	raw, err := io.ReadAll(conn)
+	if err != nil {
+		t.Fatalf("reading response: %v", err)
+	}
+	if len(raw) < 4 {
+		t.Fatalf("response is %d bytes, want at least a 4-byte header", len(raw))
+	}
+	size := binary.BigEndian.Uint32(raw[:4])
+	if int(size) != len(raw)-4 {
+		t.Errorf("header length = %d, want %d (payload size)", size, len(raw)-4)
+	}
+
+	var resp Response
+	if err := json.Unmarshal(raw[4:], &resp); err != nil {
+		t.Fatalf("decoding payload: %v", err)
+	}
+	if resp.Result != "Server=localhost;Database=test" {
+		t.Errorf("result = %q, want %q", resp.Result, "Server=localhost;Database=test")
+	}
+}
+
+func TestPipelinedRequests(t *testing.T) {
+	store := &mockStore{data: map[string]map[string]string{
+		"my_dag": {"a": "1", "b": "2", "c": "3"},
+	}}
+	sockPath, _ := startTestServer(t, store, "my_dag")
+
+	conn, err := net.Dial(testNetwork(), sockPath)
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+
+	// Write every request in one go, then read the responses back in order
+	keys := []string{"a", "b", "missing", "c"}
+	var batch []byte
+	for _, k := range keys {
+		batch = append(batch, encodeFrame(t, Request{
+			Method: "get_secret",
+			Params: map[string]string{"key": k},
+		})...)
+	}
+	if _, err := conn.Write(batch); err != nil {
+		t.Fatalf("writing batch: %v", err)
+	}
+
+	want := []string{"1", "2", "", "3"}
+	for i, k := range keys {
+		resp := readResponse(t, conn)
+		if k == "missing" {
+			if resp.Error == "" {
+				t.Errorf("response %d: expected error for missing key, got none", i)
+			}
+			continue
+		}
+		if resp.Result != want[i] {
+			t.Errorf("response %d = %q, want %q", i, resp.Result, want[i])
+		}
+	}
+}
+
+func TestShutdown_IdleConnection(t *testing.T) {
+	sockPath := filepath.Join(t.TempDir(), "test.sock")
+	store := &mockStore{data: map[string]map[string]string{"test": {"k": "v"}}}
+	srv, err := NewServer(sockPath, store, "test")
+	if err != nil {
+		t.Fatalf("NewServer() unexpected error: %v", err)
+	}
+	go srv.Serve(context.Background())
+
+	var conn net.Conn
+	for i := 0; i < 50; i++ {
+		conn, err = net.Dial(testNetwork(), srv.Addr())
+		if err == nil {
+			break
+		}
+		time.Sleep(10 * time.Millisecond)
+	}
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+
+	// Leave the connection open and idle, as a long-running task would
+	resp := sendRequestOn(t, conn, Request{Method: "get_secret", Params: map[string]string{"key": "k"}})
+	if resp.Result != "v" {
+		t.Fatalf("get_secret result = %q, want %q", resp.Result, "v")
+	}
+
+	done := make(chan error, 1)
+	go func() { done <- srv.Shutdown() }()
+	select {
+	case <-done:
+	case <-time.After(2 * time.Second):
+		t.Fatal("Shutdown() blocked on an idle client connection")
+	}
+}
+
+// writeBody writes chunks to conn as body frames followed by the
+// zero-length terminator.
+func writeBody(t *testing.T, conn net.Conn, chunks ...[]byte) {
+	t.Helper()
+	var buf []byte
+	for _, c := range chunks {
+		var hdr [4]byte
+		binary.BigEndian.PutUint32(hdr[:], uint32(len(c)))
+		buf = append(buf, hdr[:]...)
+		buf = append(buf, c...)
+	}
+	buf = append(buf, 0, 0, 0, 0)
+	if _, err := conn.Write(buf); err != nil {
+		t.Fatalf("writing body: %v", err)
+	}
+}
+
+func TestRegisterStreamHandler(t *testing.T) {
+	sockPath := filepath.Join(t.TempDir(), "test.sock")
+	store := &mockStore{data: map[string]map[string]string{"test": {"k": "v"}}}
+	srv, err := NewServer(sockPath, store, "test")
+	if err != nil {
+		t.Fatalf("NewServer() unexpected error: %v", err)
+	}
+
+	srv.RegisterStreamHandler("upload", func(_ context.Context, params map[string]string, body io.Reader) (interface{}, error) {
+		data, err := io.ReadAll(body)
+		if err != nil {
+			return nil, err
+		}
+		return fmt.Sprintf("%s:%s", params["name"], data), nil
+	})
+
+	ctx, cancel := context.WithCancel(context.Background())
+	go srv.Serve(ctx)
+	t.Cleanup(func() {
+		cancel()
+		srv.Shutdown()
+	})
+
+	var conn net.Conn
+	for i := 0; i < 50; i++ {
+		conn, err = net.Dial(testNetwork(), srv.Addr())
+		if err == nil {
+			break
+		}
+		time.Sleep(10 * time.Millisecond)
+	}
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+
+	writeRequest(t, conn, Request{Method: "upload", Params: map[string]string{"name": "f"}, Stream: true})
+	writeBody(t, conn, []byte("hello "), []byte("world"))
+	resp := readResponse(t, conn)
+	if resp.Error != "" {
+		t.Fatalf("upload error = %q", resp.Error)
+	}
+	if resp.Result != "f:hello world" {
+		t.Errorf("upload result = %q, want %q", resp.Result, "f:hello world")
+	}
+
+	// The connection must be back in sync for plain requests
+	resp = sendRequestOn(t, conn, Request{Method: "get_secret", Params: map[string]string{"key": "k"}})
+	if resp.Result != "v" {
+		t.Errorf("get_secret after upload = %q, want %q", resp.Result, "v")
+	}
+}
+
+func TestStreamHandler_UnknownMethodDrainsBody(t *testing.T) {
+	store := &mockStore{data: map[string]map[string]string{"test": {"k": "v"}}}
+	addr, cancel := startTestServer(t, store, "test")
+	defer cancel()
+
+	conn, err := net.Dial(testNetwork(), addr)
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+
+	// get_secret is only a plain method, so a streamed call is unknown
+	writeRequest(t, conn, Request{Method: "get_secret", Params: map[string]string{"key": "k"}, Stream: true})
+	writeBody(t, conn, []byte("ignored"))
+	resp := readResponse(t, conn)
+	if !strings.Contains(resp.Error, "unknown method") {
+		t.Errorf("error = %q, want it to contain %q", resp.Error, "unknown method")
+	}
+
+	resp = sendRequestOn(t, conn, Request{Method: "get_secret", Params: map[string]string{"key": "k"}})
+	if resp.Result != "v" {
+		t.Errorf("get_secret after drained body = %q, want %q", resp.Result, "v")
+	}
+}
+
+func TestRegisterResultStreamHandler(t *testing.T) {
+	sockPath := filepath.Join(t.TempDir(), "test.sock")
+	store := &mockStore{data: map[string]map[string]string{"test": {"k": "v"}}}
+	srv, err := NewServer(sockPath, store, "test")
+	if err != nil {
+		t.Fatalf("NewServer() unexpected error: %v", err)
+	}
+
+	srv.RegisterResultStreamHandler("count", func(_ context.Context, params map[string]string, send func(interface{}) error) (interface{}, error) {
+		for _, name := range strings.Split(params["names"], ",") {
+			if err := send(name); err != nil {
+				return nil, err
+			}
+		}
+		return "done", nil
+	})
+	srv.RegisterResultStreamHandler("fail", func(_ context.Context, _ map[string]string, send func(interface{}) error) (interface{}, error) {
+		if err := send("partial"); err != nil {
+			return nil, err
+		}
+		return nil, fmt.Errorf("boom")
+	})
+
+	ctx, cancel := context.WithCancel(context.Background())
+	go srv.Serve(ctx)
+	t.Cleanup(func() {
+		cancel()
+		srv.Shutdown()
+	})
+
+	var conn net.Conn
+	for i := 0; i < 50; i++ {
+		conn, err = net.Dial(testNetwork(), srv.Addr())
+		if err == nil {
+			break
+		}
+		time.Sleep(10 * time.Millisecond)
+	}
+	if err != nil {
+		t.Fatalf("connecting to socket: %v", err)
+	}
+	defer conn.Close()
+
+	writeRequest(t, conn, Request{Method: "count", Params: map[string]string{"names": "a,b,c"}})
+	for _, want := range []string{"a", "b", "c"} {
+		resp := readResponse(t, conn)
+		if !resp.More || resp.Result != want {
+			t.Fatalf("record = %+v, want result %q with more set", resp, want)
+		}
+	}
+	resp := readResponse(t, conn)
+	if resp.More || resp.Result != "done" {
+		t.Fatalf("final response = %+v, want result %q without more", resp, "done")
+	}
+
+	writeRequest(t, conn, Request{Method: "fail"})
+	if resp := readResponse(t, conn); !resp.More || resp.Result != "partial" {
+		t.Fatalf("record = %+v, want result %q with more set", resp, "partial")
+	}
+	if resp := readResponse(t, conn); resp.More || resp.Error != "boom" {
+		t.Fatalf("final response = %+v, want error %q", resp, "boom")
+	}
+
+	// Plain requests still work on the same connection
+	resp = sendRequestOn(t, conn, Request{Method: "get_secret", Params: map[string]string{"key": "k"}})
+	if resp.Result != "v" {
+		t.Errorf("get_secret after result stream = %q, want %q", resp.Result, "v")
+	}
+}
@@ -1,11 +1,11 @@
-from pit_sdk.secret import get_secret, get_secret_field
+from pit_sdk.secret import get_secret, get_secrets, get_secret_field
 from pit_sdk.db import read_sql, output_sql
-from pit_sdk.data import write_output, read_input, load_data
-from pit_sdk.ftp import ftp_list, ftp_download, ftp_upload, ftp_move
+from pit_sdk.data import write_output, read_input, read_inputs, load_data, load_table
+from pit_sdk.ftp import ftp_list, ftp_download, ftp_download_stream, ftp_upload, ftp_move
 
 __all__ = [
-    "get_secret", "get_secret_field",
+    "get_secret", "get_secrets", "get_secret_field",
     "read_sql", "output_sql",
-    "write_output", "read_input", "load_data",
-    "ftp_list", "ftp_download", "ftp_upload", "ftp_move",
+    "write_output", "read_input", "read_inputs", "load_data", "load_table",
+    "ftp_list", "ftp_download", "ftp_download_stream", "ftp_upload", "ftp_move",
 ]
@@ -0,0 +1,22 @@
+"""_json.py — JSON codec for the SDK wire protocol.
+
+Uses orjson when it is installed (``pip install pit-sdk[fast]``) and falls
+back to the standard library otherwise. Both follow orjson's conventions:
+``dumps`` returns bytes and ``loads`` accepts bytes, bytearray, memoryview,
+or str.
+"""
+
+try:
+    from orjson import dumps, loads
+except ImportError:
+    import json
+
+    def dumps(obj) -> bytes:
+        """Serialise obj to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(data):
+        """Parse JSON from bytes, bytearray, memoryview, or str."""
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
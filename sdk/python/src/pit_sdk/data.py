@@ -2,24 +2,62 @@
 
 Tasks write named outputs as Parquet files into the run's data directory.
 Downstream tasks read them back. The Go orchestrator can bulk-load
-Parquet files into databases via the load_data RPC.
+Parquet files into databases via the load_data RPC, or load in-memory
+data directly as an Arrow IPC stream via load_table.
 """
 
+import contextlib
+import functools
 import os
+import re
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 import pyarrow as pa
 import pyarrow.parquet as pq
 
+# Rows converted and written per row group when writing DataFrames.
+# Only one slice's worth of Arrow data is held alongside the DataFrame.
+_BATCH_ROWS = 65_536
+
+# Upper bound on files opened at once by read_inputs. Each read already
+# decodes columns on Arrow's own thread pool; these threads only overlap
+# the latency of opening files and reading their footers.
+_MAX_READ_WORKERS = 8
+
+# RAM-backed filesystems: compression there only costs CPU on both the
+# write and every downstream read, with no I/O to save.
+_MEMORY_FILESYSTEMS = frozenset({"tmpfs", "ramfs"})
+
+# Low ZSTD levels compress nearly as well as the default at a fraction of
+# the CPU cost, which is the right trade for scratch data read once or twice.
+_ZSTD_LEVEL = 1
+
+
+# Read once at import; _data_dir() only goes back to os.environ while unset.
+_DATA_DIR = os.environ.get("PIT_DATA_DIR")
+
 
 def _data_dir() -> str:
     """Return the run's data directory from PIT_DATA_DIR."""
-    d = os.environ.get("PIT_DATA_DIR")
-    if not d:
-        raise RuntimeError(
-            "PIT_DATA_DIR environment variable not set — "
-            "are you running inside a Pit task?"
-        )
-    return d
+    global _DATA_DIR
+
+    if not _DATA_DIR:
+        _DATA_DIR = os.environ.get("PIT_DATA_DIR")
+        if not _DATA_DIR:
+            raise RuntimeError(
+                "PIT_DATA_DIR environment variable not set — "
+                "are you running inside a Pit task?"
+            )
+    return _DATA_DIR
+
+
+def _refresh_env() -> None:
+    """Re-read PIT_DATA_DIR, for callers that change it after import."""
+    global _DATA_DIR
+
+    _DATA_DIR = os.environ.get("PIT_DATA_DIR")
 
 
 def write_output(name: str, data) -> str:
@@ -29,6 +67,7 @@ def write_output(name: str, data) -> str:
         name: Output name (without extension). The file will be written
               as ``{data_dir}/{name}.parquet``.
         data: An Arrow Table, pandas DataFrame, or polars DataFrame.
+              pandas DataFrames are written without their index.
 
     Returns:
         The absolute path to the written Parquet file.
@@ -38,29 +77,39 @@ def write_output(name: str, data) -> str:
         RuntimeError: If PIT_DATA_DIR is not set.
     """
     path = os.path.join(_data_dir(), f"{name}.parquet")
-
-    if isinstance(data, pa.Table):
-        pq.write_table(data, path)
-    elif _is_pandas_df(data):
-        table = pa.Table.from_pandas(data)
-        pq.write_table(table, path)
-    elif _is_polars_df(data):
-        data.write_parquet(path)
-    else:
-        raise TypeError(
-            f"Unsupported data type {type(data).__name__} — "
-            "pass an Arrow Table, pandas DataFrame, or polars DataFrame"
-        )
-
+    writer = _WRITERS.get(type(data)) or _resolve_writer(type(data))
+    # Write beside the target and rename into place, so a write that fails
+    # part-way never leaves a truncated file for downstream tasks to read.
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        writer(tmp, data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp)
+        raise
     return path
 
 
-def read_input(name: str) -> pa.Table:
+def read_input(
+    name: str,
+    *,
+    columns: list[str] | None = None,
+    filters=None,
+) -> pa.Table:
     """Read a named Parquet file from the run's data directory.
 
+    Only the requested columns are decoded, and row groups whose
+    statistics rule out ``filters`` are skipped entirely. Column chunks
+    are decoded in parallel from a memory-mapped file.
+
     Args:
         name: Output name (without extension). Reads from
               ``{data_dir}/{name}.parquet``.
+        columns: Column names to read (default: all columns).
+        filters: Row filter in ``pyarrow.parquet.read_table`` form, e.g.
+                 ``[("region", "=", "NSW")]`` or a ``pyarrow.compute``
+                 expression.
 
     Returns:
         An Arrow Table.
@@ -70,7 +119,52 @@ def read_input(name: str) -> pa.Table:
         RuntimeError: If PIT_DATA_DIR is not set.
     """
     path = os.path.join(_data_dir(), f"{name}.parquet")
-    return pq.read_table(path)
+    # Decoding always produces fresh Arrow buffers, so the returned table
+    # never points into the map and it can be closed straight away.
+    with pa.memory_map(path, "r") as source:
+        return pq.read_table(
+            source,
+            columns=columns,
+            filters=filters,
+            use_threads=True,
+            pre_buffer=True,
+        )
+
+
+def read_inputs(
+    names: list[str],
+    *,
+    columns: dict[str, list[str]] | None = None,
+) -> dict[str, pa.Table]:
+    """Read several named Parquet files from the data directory in parallel.
+
+    Each file is read as by :func:`read_input`, with up to eight files
+    open at once, so reading N inputs takes roughly as long as the
+    slowest one instead of all of them in turn.
+
+    Args:
+        names: Output names (without extension) to read.
+        columns: Column names to read per input name. Inputs not in
+                 the mapping are read in full.
+
+    Returns:
+        A dict mapping each name to its Arrow Table, in the order given.
+
+    Raises:
+        FileNotFoundError: If any of the Parquet files does not exist.
+        RuntimeError: If PIT_DATA_DIR is not set.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    columns = columns or {}
+
+    with ThreadPoolExecutor(max_workers=min(_MAX_READ_WORKERS, len(names))) as pool:
+        futures = {
+            name: pool.submit(read_input, name, columns=columns.get(name))
+            for name in names
+        }
+        return {name: future.result() for name, future in futures.items()}
 
 
 def load_data(
@@ -118,11 +212,276 @@ def load_data(
     )
 
 
-def _is_pandas_df(obj) -> bool:
-    """Check if obj is a pandas DataFrame without importing pandas."""
-    return type(obj).__module__.startswith("pandas") and type(obj).__name__ == "DataFrame"
+def load_table(
+    data,
+    table: str,
+    connection: str,
+    *,
+    schema: str = "dbo",
+    mode: str = "append",
+) -> str:
+    """Bulk-load in-memory data into a database table without a Parquet file.
 
+    The data is streamed to the Go orchestrator's ``load_table`` handler as
+    Arrow IPC record batches over the SDK connection and loaded with the
+    native database driver as they arrive, skipping the Parquet encode,
+    compress, decompress, and decode passes of
+    ``write_output`` + ``load_data``.
 
-def _is_polars_df(obj) -> bool:
-    """Check if obj is a polars DataFrame without importing polars."""
-    return type(obj).__module__.startswith("polars") and type(obj).__name__ == "DataFrame"
+    Args:
+        data: An Arrow Table, pandas DataFrame, or polars DataFrame.
+              pandas DataFrames are sent without their index.
+        table: Target table name.
+        connection: Secret key for the connection string
+                    (resolved from secrets store).
+        schema: Target schema (default "dbo").
+        mode: Load mode — "append", "truncate_and_load", or
+              "create_or_replace" (drops and recreates the table
+              from the data's Arrow schema). In append mode rows are
+              loaded as they arrive, so a call that fails part-way can
+              leave some of them in the table. The other modes buffer the
+              whole stream on the orchestrator first, so an aborted call
+              never leaves the table dropped or emptied.
+
+    Returns:
+        A message from the orchestrator (e.g. "1000 rows loaded").
+
+    Raises:
+        TypeError: If data is not a supported type.
+        RuntimeError: If PIT_SOCKET is not set or the RPC fails.
+    """
+    from pit_sdk.secret import _request_stream
+
+    arrow_schema, tables = _arrow_slices(data)
+
+    def write_body(sink) -> None:
+        with pa.ipc.new_stream(sink, arrow_schema) as writer:
+            for sub in tables:
+                writer.write_table(sub, max_chunksize=_BATCH_ROWS)
+
+    return _request_stream(
+        "load_table",
+        {
+            "table": table,
+            "connection": connection,
+            "schema": schema,
+            "mode": mode,
+        },
+        write_body,
+    )
+
+
+def _arrow_slices(data) -> tuple[pa.Schema, Iterable[pa.Table]]:
+    """Return data's Arrow schema and its rows as Arrow Tables.
+
+    pandas DataFrames are converted lazily one ``_BATCH_ROWS`` slice at a
+    time, as in ``_write_output_batched``; Arrow and polars data is passed
+    through whole, since neither needs a copy.
+    """
+    # The writer write_output would pick identifies the kind of data
+    writer = _WRITERS.get(type(data)) or _resolve_writer(type(data))
+    if writer is _write_output_batched:
+        return _pandas_slices(data)
+    if writer is _write_polars:
+        data = data.to_arrow()
+    return data.schema, [data]
+
+
+def _write_arrow(path: str, table: pa.Table) -> None:
+    """Write an Arrow Table to Parquet."""
+    pq.write_table(table, path, **_compression_options(path))
+
+
+def _write_polars(path: str, df) -> None:
+    """Write a polars DataFrame with polars' native Parquet writer."""
+    codec = _preferred_compression(path)
+    df.write_parquet(
+        path,
+        compression="uncompressed" if codec == "none" else codec,
+        compression_level=_ZSTD_LEVEL if codec == "zstd" else None,
+        row_group_size=_BATCH_ROWS,
+    )
+
+
+def _write_output_batched(path: str, df, batch_rows: int = _BATCH_ROWS) -> None:
+    """Write a pandas DataFrame to Parquet one slice at a time.
+
+    Each slice of ``batch_rows`` rows is converted to Arrow, written as its
+    own row group, and released before the next one, so peak memory is the
+    DataFrame plus a single slice rather than the DataFrame plus a full copy.
+    Every slice is converted to one schema (see ``_pandas_slices``), so all
+    row groups agree on column types.
+    """
+    schema, slices = _pandas_slices(df, batch_rows)
+    with pq.ParquetWriter(
+        path,
+        schema,
+        **_compression_options(path),
+        use_dictionary=True,
+        data_page_version="2.0",
+        write_batch_size=batch_rows,
+    ) as writer:
+        for sub in slices:
+            writer.write_table(sub, row_group_size=batch_rows)
+
+
+def _pandas_slices(df, batch_rows: int = _BATCH_ROWS) -> tuple[pa.Schema, Iterator[pa.Table]]:
+    """Return a pandas DataFrame's Arrow schema and its slices as Arrow Tables.
+
+    The schema comes from converting the first slice, which the iterator
+    then yields as is. Columns with a fixed dtype convert to the same type
+    in every slice, but an object column's type depends on all of its
+    values (ints then floats, decimals of growing scale), so those types are
+    inferred from the whole column. Later slices are converted lazily, one
+    at a time, with safe casts so any remaining mismatch raises instead of
+    truncating values.
+    """
+    first = _pandas_to_arrow(df.iloc[:batch_rows])
+    schema = first.schema
+    if len(df) > batch_rows:
+        objects = [i for i, dt in enumerate(df.dtypes) if dt == object]
+        if objects:
+            inferred = pa.Schema.from_pandas(df.iloc[:, objects], preserve_index=False)
+            for i, field in zip(objects, inferred):
+                schema = schema.set(i, schema.field(i).with_type(field.type))
+            first = first.cast(schema)
+
+    def slices() -> Iterator[pa.Table]:
+        if len(df):
+            yield first
+        for start in range(batch_rows, len(df), batch_rows):
+            yield _pandas_to_arrow(df.iloc[start:start + batch_rows], schema)
+
+    return schema, slices()
+
+
+def _pandas_to_arrow(df, schema: pa.Schema | None = None) -> pa.Table:
+    """Convert a pandas DataFrame to an Arrow Table, dropping the index.
+
+    DataFrames whose columns are all plain NumPy numeric or bool arrays are
+    wrapped column by column with ``pa.array``, skipping the block-manager
+    round trip. Anything else goes through ``pa.Table.from_pandas`` with
+    one conversion thread per core. Safe-cast checks are only skipped while
+    inferring types; converting to a given schema checks every cast.
+    """
+    if _is_numeric_frame(df):
+        arrays = [pa.array(df[name].to_numpy(), from_pandas=True) for name in df.columns]
+        if schema is not None:
+            return pa.Table.from_arrays(arrays, schema=schema)
+        return pa.Table.from_arrays(arrays, names=list(df.columns))
+    if schema is not None and list(df.columns) != schema.names:
+        # from_pandas matches schema fields to columns by label, but the
+        # schema's names are the stringified labels (0 becomes "0")
+        df = df.copy(deep=False)
+        df.columns = schema.names
+    return pa.Table.from_pandas(
+        df,
+        schema=schema,
+        preserve_index=False,
+        safe=schema is not None,
+        nthreads=os.cpu_count(),
+    )
+
+
+def _is_numeric_frame(df) -> bool:
+    """Check if every column of df is a NumPy int, uint, float, or bool array."""
+    import numpy as np
+
+    if not df.columns.is_unique or not all(isinstance(c, str) for c in df.columns):
+        return False
+    return all(
+        isinstance(dt, np.dtype) and dt.kind in "iufb" for dt in df.dtypes
+    )
+
+
+def _preferred_compression(path: str) -> str:
+    """Pick the Parquet codec for a file written at path.
+
+    Returns ``"none"`` when the target directory sits on tmpfs or ramfs,
+    where reads never touch a disk, and ``"zstd"`` everywhere else.
+    """
+    return _dir_compression(os.path.dirname(os.path.abspath(path)))
+
+
+def _compression_options(path: str) -> dict:
+    """Return ``compression``/``compression_level`` kwargs for pyarrow writers."""
+    codec = _preferred_compression(path)
+    return {
+        "compression": codec,
+        "compression_level": _ZSTD_LEVEL if codec == "zstd" else None,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _dir_compression(directory: str) -> str:
+    """Cached per-directory codec choice (the data dir never changes mid-run)."""
+    if _fs_type(directory) in _MEMORY_FILESYSTEMS:
+        return "none"
+    return "zstd"
+
+
+def _fs_type(directory: str) -> str | None:
+    """Return the filesystem type backing directory, or None if unknown.
+
+    Reads ``/proc/self/mountinfo``; platforms without procfs (Windows,
+    macOS) return None.
+    """
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    return _mount_fs_type(lines, os.path.realpath(directory))
+
+
+def _mount_fs_type(lines: list[str], target: str) -> str | None:
+    """Pick the filesystem type of the longest mount point containing target.
+
+    ``lines`` are mountinfo entries: the mount point is the fifth field and
+    the type follows the ``-`` separator.
+    """
+    best, fstype = "", None
+    for line in lines:
+        fields = line.split()
+        if "-" not in fields:
+            continue
+        mount = _unescape_mount(fields[4])
+        prefix = mount.rstrip("/") + "/"
+        # Later entries shadow earlier ones at the same mount point
+        if (target == mount or target.startswith(prefix)) and len(mount) >= len(best):
+            best, fstype = mount, fields[fields.index("-") + 1]
+    return fstype
+
+
+def _unescape_mount(field: str) -> str:
+    """Decode the octal escapes (``\\040`` for space, etc.) used in mountinfo."""
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+
+# Writer per concrete data type, filled in by _resolve_writer the first
+# time each type is seen so later calls skip the type inspection.
+_WRITERS: dict[type, Callable[[str, object], None]] = {pa.Table: _write_arrow}
+
+
+def _resolve_writer(cls: type) -> Callable[[str, object], None]:
+    """Find and cache the writer for cls without importing pandas or polars.
+
+    Walks the MRO so subclasses of an Arrow Table or a pandas/polars
+    DataFrame are handled like their base.
+    """
+    for base in cls.__mro__:
+        if base is pa.Table:
+            writer = _write_arrow
+        elif base.__name__ == "DataFrame" and base.__module__.startswith("pandas"):
+            writer = _write_output_batched
+        elif base.__name__ == "DataFrame" and base.__module__.startswith("polars"):
+            writer = _write_polars
+        else:
+            continue
+        _WRITERS[cls] = writer
+        return writer
+
+    raise TypeError(
+        f"Unsupported data type {cls.__name__} — "
+        "pass an Arrow Table, pandas DataFrame, or polars DataFrame"
+    )
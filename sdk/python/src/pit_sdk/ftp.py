@@ -4,9 +4,9 @@ All functions communicate with the Go FTP client through the SDK socket.
 Credentials are resolved from structured secrets — Python never sees passwords.
 """
 
-import json
+from collections.abc import Iterator
 
-from pit_sdk.secret import _request
+from pit_sdk.secret import _request, _request_results
 
 
 def ftp_list(secret: str, directory: str, pattern: str = "*") -> list[str]:
@@ -20,12 +20,11 @@ def ftp_list(secret: str, directory: str, pattern: str = "*") -> list[str]:
     Returns:
         List of matching filenames (names only, not full paths).
     """
-    result = _request("ftp_list", {
+    return _request("ftp_list", {
         "secret": secret,
         "directory": directory,
         "pattern": pattern,
     })
-    return json.loads(result)
 
 
 def ftp_download(
@@ -63,8 +62,46 @@ def ftp_download(
     else:
         params["remote_path"] = remote_path
 
-    result = _request("ftp_download", params)
-    return json.loads(result)
+    return _request("ftp_download", params)
+
+
+def ftp_download_stream(
+    secret: str,
+    directory: str,
+    pattern: str = "*",
+    *,
+    concurrency: int = 8,
+) -> Iterator[str]:
+    """Download matching files in parallel, yielding each as it lands.
+
+    The orchestrator opens up to ``concurrency`` FTP sessions and reports
+    every completed file straight away, so processing the first files
+    overlaps with downloading the rest::
+
+        for path in ftp_download_stream("ftp_creds", "/incoming", "*.csv"):
+            process(path)
+
+    Files are yielded in completion order, not listing order. Stopping
+    early cancels downloads that have not started.
+
+    Args:
+        secret: Name of the structured secret (host, user, password, port, tls).
+        directory: Remote directory to list.
+        pattern: Glob pattern to filter filenames (default ``"*"``).
+        concurrency: Maximum number of simultaneous FTP sessions.
+
+    Yields:
+        Local file paths (absolute, inside PIT_DATA_DIR).
+
+    Raises:
+        RuntimeError: If listing or any download fails.
+    """
+    yield from _request_results("ftp_download_stream", {
+        "secret": secret,
+        "directory": directory,
+        "pattern": pattern,
+        "concurrency": str(concurrency),
+    })
 
 
 def ftp_upload(secret: str, local_name: str, remote_path: str) -> None:
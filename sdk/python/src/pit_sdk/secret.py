@@ -4,60 +4,382 @@ Communicates with the Pit SDK server over a socket connection.
 On Unix the server uses a Unix domain socket; on Windows it uses TCP on localhost.
 The address is read from the PIT_SOCKET environment variable,
 which is set automatically by the orchestrator for every task.
+
+Every message on the wire is a frame: a 4-byte big-endian length followed by
+a JSON payload. The client keeps an idle connection open for the life of
+the process, so several requests can be pipelined without reconnecting;
+threads that call in while it is busy get a connection of their own.
+Requests that carry bulk data (see :func:`_request_stream`) follow the
+request frame with body frames and a zero-length terminator frame, and
+methods that stream results (see :func:`_request_results`) answer with a
+run of ``"more": true`` record frames before their final response.
 """
 
-import json
+import contextlib
+import functools
+import io
 import os
 import socket
+import threading
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from pit_sdk import _json
+
+# Kernel send/receive buffer size for SDK sockets, large enough that a
+# typical response (secrets, FTP listings) arrives in one copy to user space.
+_SOCK_BUFSIZE = 1 << 20
+
+# Payload size of each request body frame; must stay under the server's
+# 16 MiB frame limit.
+_BODY_CHUNK = 1 << 20
 
+# Most requests _request_many sends before reading their responses. The
+# server answers each frame as it reads it, so an unbounded batch would
+# fill the socket buffers with responses and stall both sides.
+_PIPELINE_FRAMES = 256
+_PIPELINE_BYTES = 256 << 10
 
-def _connect(addr: str) -> socket.socket:
-    """Connect to the SDK server, auto-detecting transport from the address format.
+_conn: socket.socket | None = None
+_conn_pid: int | None = None
+_conn_lock = threading.Lock()
+
+
+def _parse_addr(addr: str) -> tuple[int, str | tuple[str, int]]:
+    """Resolve an SDK address into a socket family and connect target.
 
     TCP addresses look like ``127.0.0.1:12345`` (used on Windows).
     Anything else is treated as a Unix domain socket path.
     """
     host, _, port = addr.rpartition(":")
     if host and port.isdigit():
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.connect((host, int(port)))
-        return s
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, addr
+
 
-    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-    s.connect(addr)
+# Parsed once at import; _new_conn() only goes back to os.environ while unset.
+_SOCK_ADDR = os.environ.get("PIT_SOCKET")
+_SOCK_FAMILY, _SOCK_TARGET = _parse_addr(_SOCK_ADDR) if _SOCK_ADDR else (None, None)
+
+
+def _connect() -> socket.socket:
+    """Connect to the SDK server at the resolved PIT_SOCKET address.
+
+    Socket buffers are enlarged before connecting, and Nagle is disabled
+    on TCP so small request frames go out immediately.
+    """
+    s = socket.socket(_SOCK_FAMILY, socket.SOCK_STREAM)
+    try:
+        for opt in (socket.SO_SNDBUF, socket.SO_RCVBUF):
+            try:
+                s.setsockopt(socket.SOL_SOCKET, opt, _SOCK_BUFSIZE)
+            except OSError:
+                pass  # best effort — the kernel may cap or refuse the size
+        if _SOCK_FAMILY == socket.AF_INET:
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        s.connect(_SOCK_TARGET)
+    except OSError:
+        s.close()
+        raise
     return s
 
 
-def _request(method: str, params: dict[str, str] | None = None) -> str:
-    """Send a JSON request to the SDK server and return the result."""
-    sock_addr = os.environ.get("PIT_SOCKET")
-    if not sock_addr:
-        raise RuntimeError(
-            "PIT_SOCKET environment variable not set — "
-            "are you running inside a Pit task?"
-        )
+def _recv_exact(s: socket.socket, size: int) -> bytearray:
+    """Read exactly ``size`` bytes from the socket into a preallocated buffer."""
+    buf = bytearray(size)
+    view = memoryview(buf)
+    n = 0
+    while n < size:
+        r = s.recv_into(view[n:])
+        if not r:
+            raise RuntimeError(
+                f"SDK error: connection closed after {n} of {size} bytes"
+            )
+        n += r
+    return buf
+
+
+def _new_conn() -> socket.socket:
+    """Open a new connection to the SDK server at PIT_SOCKET."""
+    if not _SOCK_ADDR:
+        _load_addr()
+        if not _SOCK_ADDR:
+            raise RuntimeError(
+                "PIT_SOCKET environment variable not set — "
+                "are you running inside a Pit task?"
+            )
+    return _connect()
+
+
+def _close_conn() -> None:
+    """Drop the cached connection so the next request reconnects.
+
+    The caller must hold ``_conn_lock``.
+    """
+    global _conn, _conn_pid
+
+    if _conn is not None and _conn_pid == os.getpid():
+        _conn.close()
+    _conn = None
+    _conn_pid = None
+
+
+def _take_conn() -> socket.socket:
+    """Check out a connection for exclusive use by one request.
+
+    Returns the idle process-wide connection if there is one, or opens a
+    new one otherwise, so a long call on one thread never holds up another
+    thread's requests. The lock only guards the slot, not the request. A
+    connection inherited across ``fork()`` is never reused, since parent
+    and child would interleave frames on the same stream.
+    """
+    global _conn, _conn_pid
+
+    with _conn_lock:
+        s = _conn if _conn_pid == os.getpid() else None
+        _conn = None
+        _conn_pid = None
+    return s if s is not None else _new_conn()
+
+
+def _return_conn(s: socket.socket) -> None:
+    """Make s the shared connection again, or close it if one was opened."""
+    global _conn, _conn_pid
+
+    with _conn_lock:
+        if _conn is None:
+            _conn = s
+            _conn_pid = os.getpid()
+        else:
+            s.close()
+
+
+@contextlib.contextmanager
+def _leased_conn() -> Iterator[socket.socket]:
+    """Check out a connection for the body of a ``with`` block.
+
+    The connection is handed back when the block completes. If the block
+    raises, the stream may be mid-frame, so it is closed instead.
+    """
+    s = _take_conn()
+    try:
+        yield s
+    except BaseException:
+        s.close()
+        raise
+    _return_conn(s)
+
+
+def _refresh_env() -> None:
+    """Re-read PIT_SOCKET and drop the cached connection.
+
+    For callers that point the SDK at a different server after import.
+    """
+    with _conn_lock:
+        _close_conn()
+        _load_addr()
+    get_secret.cache_clear()
+
+
+def _load_addr() -> None:
+    """Read and parse PIT_SOCKET into the module-level address globals."""
+    global _SOCK_ADDR, _SOCK_FAMILY, _SOCK_TARGET
+
+    _SOCK_ADDR = os.environ.get("PIT_SOCKET")
+    _SOCK_FAMILY, _SOCK_TARGET = _parse_addr(_SOCK_ADDR) if _SOCK_ADDR else (None, None)
+
+
+@functools.lru_cache(maxsize=None)
+def _frame_prefix(method: str) -> bytes:
+    """Return the encoded start of a request envelope, up to its params."""
+    return b'{"method":' + _json.dumps(method) + b',"params":'
+
+
+def _frame(method: str, params: dict[str, str] | None, stream: bool = False) -> bytes:
+    """Encode a request as a length-prefixed JSON frame.
+
+    The envelope is spliced together from a cached per-method prefix and
+    the encoded params, so only the params dict is serialised per call.
+    ``stream`` marks a request whose body frames follow it on the wire.
+    """
+    payload = b"".join((
+        _frame_prefix(method),
+        _json.dumps(params) if params else b"{}",
+        b',"stream":true}' if stream else b"}",
+    ))
+    return len(payload).to_bytes(4, "big") + payload
+
+
+class _FrameSink(io.RawIOBase):
+    """Writable file that sends everything written as request body frames.
+
+    Small writes are coalesced into frames of up to ``_BODY_CHUNK`` bytes;
+    large writes are framed and sent straight from the caller's buffer
+    without being copied. ``finish()`` sends the terminator frame; closing
+    the file alone does not, so an abandoned body is never terminated.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
 
-    payload = json.dumps({"method": method, "params": params or {}}).encode()
+    def tell(self) -> int:
+        return self._pos
 
-    with _connect(sock_addr) as s:
-        s.sendall(payload)
-        s.shutdown(socket.SHUT_WR)
+    def write(self, b) -> int:
+        view = memoryview(b).cast("B")
+        size = len(view)
+        self._pos += size
+        if len(self._buf) + size <= _BODY_CHUNK:
+            self._buf += view
+            return size
+        self.flush()
+        if size < _BODY_CHUNK:
+            self._buf += view
+            return size
+        for start in range(0, size, _BODY_CHUNK):
+            self._send(view[start:start + _BODY_CHUNK])
+        return size
 
-        chunks: list[bytes] = []
+    def flush(self) -> None:
+        if self._buf:
+            self._send(self._buf)
+            self._buf = bytearray()
+
+    def close(self) -> None:
+        # Anything still buffered belongs to an unfinished body; drop it
+        self._buf = bytearray()
+        super().close()
+
+    def finish(self) -> None:
+        self.flush()
+        self._sock.sendall(b"\x00\x00\x00\x00")
+
+    def _send(self, chunk) -> None:
+        self._sock.sendall(len(chunk).to_bytes(4, "big"))
+        self._sock.sendall(chunk)
+
+
+def _request_many(calls: list[tuple[str, dict[str, str] | None]]) -> list[Any]:
+    """Pipeline several requests over the shared connection.
+
+    Request frames are written in windows of up to ``_PIPELINE_FRAMES``
+    frames or ``_PIPELINE_BYTES`` bytes, and each window's responses are
+    read back before the next is sent, so N calls cost about
+    N / ``_PIPELINE_FRAMES`` round trips instead of N connect/close pairs.
+
+    Args:
+        calls: ``(method, params)`` pairs to send.
+
+    Returns:
+        The result of each call, in the same order as ``calls``. Results
+        are decoded JSON values — a string for most methods, a list for
+        methods such as ``ftp_list``.
+
+    Raises:
+        RuntimeError: If PIT_SOCKET is not set, the connection fails, or any
+                      call returns an error (the first error is raised).
+    """
+    if not calls:
+        return []
+
+    frames = [_frame(method, params) for method, params in calls]
+
+    with _leased_conn() as s:
+        responses = []
+        for window in _windows(frames):
+            s.sendall(b"".join(window))
+            for _ in window:
+                size = int.from_bytes(_recv_exact(s, 4), "big")
+                responses.append(_json.loads(_recv_exact(s, size)))
+
+    for resp in responses:
+        if resp.get("error"):
+            raise RuntimeError(f"SDK error: {resp['error']}")
+
+    return [resp.get("result", "") for resp in responses]
+
+
+def _windows(frames: list[bytes]) -> Iterator[list[bytes]]:
+    """Split frames into pipeline windows (see ``_PIPELINE_FRAMES``)."""
+    window: list[bytes] = []
+    size = 0
+    for frame in frames:
+        if window and (len(window) == _PIPELINE_FRAMES or size + len(frame) > _PIPELINE_BYTES):
+            yield window
+            window, size = [], 0
+        window.append(frame)
+        size += len(frame)
+    if window:
+        yield window
+
+
+def _request(method: str, params: dict[str, str] | None = None) -> Any:
+    """Send a JSON request to the SDK server and return the decoded result."""
+    return _request_many([(method, params)])[0]
+
+
+def _request_results(method: str, params: dict[str, str] | None = None) -> Iterator[Any]:
+    """Send a request and yield its streamed results as they arrive.
+
+    For methods that answer with record frames ahead of their final
+    response. The connection is checked out for the duration, so the
+    caller may make other SDK calls between records. Abandoning the
+    iterator early closes the connection, which tells the server to stop.
+
+    Raises:
+        RuntimeError: If PIT_SOCKET is not set, the connection fails, or
+                      the call returns an error.
+    """
+    with _leased_conn() as s:
+        s.sendall(_frame(method, params))
         while True:
-            chunk = s.recv(4096)
-            if not chunk:
+            size = int.from_bytes(_recv_exact(s, 4), "big")
+            resp = _json.loads(_recv_exact(s, size))
+            if not resp.get("more"):
                 break
-            chunks.append(chunk)
-
-    resp = json.loads(b"".join(chunks))
+            yield resp.get("result", "")
 
     if resp.get("error"):
         raise RuntimeError(f"SDK error: {resp['error']}")
 
+
+def _request_stream(
+    method: str,
+    params: dict[str, str] | None,
+    write_body: Callable[[io.RawIOBase], None],
+) -> Any:
+    """Send a request with a streamed body over the shared connection.
+
+    ``write_body`` is called with a writable file; whatever it writes is
+    sent to the server as it is produced, so bulk data never has to be
+    staged in memory or on disk. The connection is checked out for the
+    whole call.
+
+    Raises:
+        RuntimeError: If PIT_SOCKET is not set, the connection fails, or
+                      the call returns an error.
+    """
+    header = _frame(method, params, stream=True)
+
+    with _leased_conn() as s:
+        s.sendall(header)
+        sink = _FrameSink(s)
+        write_body(sink)
+        sink.finish()
+        size = int.from_bytes(_recv_exact(s, 4), "big")
+        resp = _json.loads(_recv_exact(s, size))
+
+    if resp.get("error"):
+        raise RuntimeError(f"SDK error: {resp['error']}")
     return resp.get("result", "")
 
 
+@functools.lru_cache(maxsize=256)
 def get_secret(key: str) -> str:
     """Retrieve a secret from the Pit secrets store.
 
@@ -65,6 +387,9 @@ def get_secret(key: str) -> str:
     For structured secrets (with multiple fields), returns a JSON string
     that can be parsed with ``json.loads()``.
 
+    Secrets do not change while a task runs, so values are cached per key
+    and repeated lookups skip the round trip. Failed lookups are not cached.
+
     Args:
         key: The secret key to look up. Resolution checks the current
              project's section first, then falls back to [global].
@@ -79,6 +404,24 @@ def get_secret(key: str) -> str:
     return _request("get_secret", {"key": key})
 
 
+def get_secrets(keys: list[str]) -> dict[str, str]:
+    """Retrieve several secrets in one round trip to the orchestrator.
+
+    Args:
+        keys: The secret keys to look up. Each is resolved as in
+              :func:`get_secret`.
+
+    Returns:
+        A dict mapping each key to its secret value.
+
+    Raises:
+        RuntimeError: If PIT_SOCKET is not set, any key is not found,
+                      or the SDK server returns an error.
+    """
+    results = _request_many([("get_secret", {"key": key}) for key in keys])
+    return dict(zip(keys, results))
+
+
 def get_secret_field(secret: str, field: str) -> str:
     """Retrieve a single field from a structured secret.
 
@@ -0,0 +1,134 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from pit_sdk import data
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PIT_DATA_DIR", str(tmp_path))
+    data._refresh_env()
+    yield tmp_path
+    data._refresh_env()
+
+
+def test_write_output_int_labelled_numeric_frame():
+    df = pd.DataFrame(np.ones((3, 2)))
+
+    data.write_output("x", df)
+
+    table = data.read_input("x")
+    assert table.column_names == ["0", "1"]
+    assert table.num_rows == 3
+
+
+def test_write_output_int_labelled_object_frame(data_dir):
+    df = pd.DataFrame({0: ["a", "b", "c"], 1: [1.0, 2.0, 3.0]})
+
+    data._write_output_batched(str(data_dir / "x.parquet"), df, batch_rows=2)
+
+    table = data.read_input("x")
+    assert table.column_names == ["0", "1"]
+    assert table.column("0").to_pylist() == ["a", "b", "c"]
+
+
+def test_arrow_slices_int_labelled_frame():
+    df = pd.DataFrame({0: ["a", "b", "c"], 1: [1, 2, 3]})
+
+    schema, tables = data._arrow_slices(df)
+
+    table = pa.concat_tables(tables)
+    assert schema.names == ["0", "1"]
+    assert table.column("0").to_pylist() == ["a", "b", "c"]
+
+
+def test_write_output_batched_null_first_slice(data_dir):
+    a = pd.Series([None, None, "x", "y"], dtype=object)
+    df = pd.DataFrame({"a": a, "b": [1.0, 2.0, 3.0, 4.0]})
+
+    data._write_output_batched(str(data_dir / "x.parquet"), df, batch_rows=2)
+
+    table = data.read_input("x")
+    assert not pa.types.is_null(table.schema.field("a").type)
+    assert table.column("a").to_pylist() == [None, None, "x", "y"]
+
+
+def test_write_output_batched_object_ints_then_floats(data_dir):
+    df = pd.DataFrame({"a": pd.Series([0, 1, 0.5, 1.5, 2.75], dtype=object)})
+
+    data._write_output_batched(str(data_dir / "x.parquet"), df, batch_rows=2)
+
+    table = data.read_input("x")
+    assert table.schema.field("a").type == pa.float64()
+    assert table.column("a").to_pylist() == [0.0, 1.0, 0.5, 1.5, 2.75]
+
+
+def test_write_output_batched_object_decimals_growing_scale(data_dir):
+    from decimal import Decimal
+
+    values = [Decimal("1.1"), Decimal("1.1"), Decimal("123.456")]
+    df = pd.DataFrame({"d": pd.Series(values, dtype=object)})
+
+    data._write_output_batched(str(data_dir / "d.parquet"), df, batch_rows=2)
+
+    assert data.read_input("d").column("d").to_pylist() == values
+
+
+def test_write_output_failure_leaves_no_file(data_dir, monkeypatch):
+    def failing_writer(path, table):
+        with open(path, "wb") as f:
+            f.write(b"PAR1partial")
+        raise RuntimeError("disk full")
+
+    monkeypatch.setitem(data._WRITERS, pa.Table, failing_writer)
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        data.write_output("x", pa.table({"a": [1]}))
+
+    assert list(data_dir.iterdir()) == []
+
+
+MOUNTINFO = [
+    "22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw\n",
+    "30 22 0:26 / /run rw,nosuid shared:5 - tmpfs tmpfs rw\n",
+    "31 30 0:27 / /run/pit rw,nosuid shared:6 - tmpfs tmpfs rw\n",
+    "40 22 259:3 / /data rw,relatime shared:7 - ext4 /dev/nvme1n1 rw\n",
+    "41 40 0:30 / /data rw,relatime shared:8 - tmpfs tmpfs rw\n",
+    "50 22 259:4 / /mnt/my\\040disk rw,relatime shared:9 - xfs /dev/sdb1 rw\n",
+]
+
+
+@pytest.mark.parametrize(
+    "target, want",
+    [
+        ("/home/task", "ext4"),                # only the root mount matches
+        ("/run/pit/data", "tmpfs"),            # tmpfs nested under ext4 /
+        ("/runner", "ext4"),                   # /run is not a path prefix of /runner
+        ("/data/outputs", "tmpfs"),            # later entry shadows /data
+        ("/mnt/my disk/run1", "xfs"),          # \040 decodes to a space
+        ("/mnt/my\\040disk", "ext4"),          # the escaped form is not a path
+    ],
+)
+def test_mount_fs_type(target, want):
+    assert data._mount_fs_type(MOUNTINFO, target) == want
+
+
+def test_mount_fs_type_skips_malformed_lines():
+    lines = ["garbage\n", MOUNTINFO[0]]
+    assert data._mount_fs_type(lines, "/tmp") == "ext4"
+
+
+def test_dir_compression_without_procfs(monkeypatch, tmp_path):
+    def no_procfs(*args, **kwargs):
+        raise FileNotFoundError("/proc/self/mountinfo")
+
+    monkeypatch.setattr("builtins.open", no_procfs)
+    data._dir_compression.cache_clear()
+    try:
+        assert data._fs_type(str(tmp_path)) is None
+        assert data._dir_compression(str(tmp_path)) == "zstd"
+    finally:
+        data._dir_compression.cache_clear()
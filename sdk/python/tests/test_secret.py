@@ -0,0 +1,200 @@
+import json
+import socket
+import threading
+import time
+
+import pyarrow as pa
+import pytest
+
+from pit_sdk import data, secret
+
+
+class FramedServer:
+    """Minimal SDK server: answers each framed request as it reads it."""
+
+    def __init__(self, path):
+        self.body_frames = []  # payload sizes of the last streamed body
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(str(path))
+        self.sock.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                hdr = self._recv(conn, 4)
+                if hdr is None:
+                    return
+                req = json.loads(self._recv(conn, int.from_bytes(hdr, "big")))
+                params = req["params"]
+                if req.get("stream"):
+                    body = self._recv_body(conn)
+                    if body is None:
+                        return
+                    rows = pa.ipc.open_stream(body).read_all().num_rows
+                    result = f"{rows} rows loaded into {params['table']}"
+                elif req["method"] == "slow":
+                    time.sleep(float(params["seconds"]))
+                    result = "done"
+                else:
+                    result = "val-" + params["key"]
+                payload = json.dumps({"result": result}).encode()
+                conn.sendall(len(payload).to_bytes(4, "big") + payload)
+
+    def _recv_body(self, conn):
+        self.body_frames = []
+        body = bytearray()
+        while True:
+            hdr = self._recv(conn, 4)
+            if hdr is None:
+                return None
+            size = int.from_bytes(hdr, "big")
+            if size == 0:
+                return bytes(body)
+            chunk = self._recv(conn, size)
+            if chunk is None:
+                return None
+            self.body_frames.append(size)
+            body += chunk
+
+    @staticmethod
+    def _recv(conn, size):
+        buf = b""
+        while len(buf) < size:
+            chunk = conn.recv(size - len(buf))
+            if not chunk:
+                return None
+            buf += chunk
+        return buf
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture(autouse=True)
+def server(tmp_path, monkeypatch):
+    path = tmp_path / "sdk.sock"
+    srv = FramedServer(path)
+    monkeypatch.setenv("PIT_SOCKET", str(path))
+    secret._refresh_env()
+    yield srv
+    srv.close()
+    secret._refresh_env()
+
+
+def run_with_timeout(fn, timeout=10):
+    result = {}
+    t = threading.Thread(target=lambda: result.setdefault("value", fn()), daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "call did not finish"
+    return result["value"]
+
+
+def test_get_secrets_large_batch():
+    keys = [f"k{i}" for i in range(50_000)]
+
+    got = run_with_timeout(lambda: secret.get_secrets(keys))
+
+    assert len(got) == len(keys)
+    assert got["k49999"] == "val-k49999"
+
+
+def test_slow_call_does_not_block_other_threads():
+    slow = threading.Thread(target=secret._request, args=("slow", {"seconds": "2"}), daemon=True)
+    slow.start()
+    time.sleep(0.2)
+
+    start = time.perf_counter()
+    got = run_with_timeout(lambda: secret.get_secrets(["a", "b"]))
+
+    assert got == {"a": "val-a", "b": "val-b"}
+    assert time.perf_counter() - start < 1
+    slow.join()
+
+
+class RecordingSocket:
+    """Stands in for a socket and keeps everything sent on it."""
+
+    def __init__(self):
+        self.sent = bytearray()
+
+    def sendall(self, data):
+        self.sent += data
+
+
+def parse_frames(buf):
+    frames = []
+    while buf:
+        size = int.from_bytes(buf[:4], "big")
+        frames.append(bytes(buf[4:4 + size]))
+        buf = buf[4 + size:]
+    return frames
+
+
+def test_frame_sink_coalesces_small_writes():
+    sock = RecordingSocket()
+    sink = secret._FrameSink(sock)
+
+    for _ in range(100):
+        sink.write(b"x" * 10)
+    sink.finish()
+
+    assert parse_frames(sock.sent) == [b"x" * 1000, b""]
+
+
+def test_frame_sink_slices_large_writes():
+    sock = RecordingSocket()
+    sink = secret._FrameSink(sock)
+    chunk = secret._BODY_CHUNK
+
+    sink.write(b"head")
+    sink.write(b"y" * (2 * chunk + chunk // 2))
+    sink.finish()
+
+    frames = parse_frames(sock.sent)
+    assert [len(f) for f in frames] == [4, chunk, chunk, chunk // 2, 0]
+    assert b"".join(frames) == b"head" + b"y" * (2 * chunk + chunk // 2)
+
+
+def test_load_table_multi_mib(server):
+    rows = 400_000
+    table = pa.table({"a": pa.array(range(rows), pa.int64()), "b": pa.array([0.5] * rows)})
+
+    got = run_with_timeout(lambda: data.load_table(table, "t", "conn"))
+
+    assert got == f"{rows} rows loaded into t"
+    assert len(server.body_frames) > 1
+    assert max(server.body_frames) <= secret._BODY_CHUNK
+
+
+def test_load_table_empty_dataframe():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({"a": pd.Series([], dtype="float64")})
+
+    got = run_with_timeout(lambda: data.load_table(df, "t", "conn"))
+
+    assert got == "0 rows loaded into t"
+
+
+def test_request_stream_aborted_body_drops_connection():
+    secret.get_secrets(["a"])  # leave an idle connection in the slot
+    assert secret._conn is not None
+
+    def write_body(sink):
+        sink.write(b"x" * 100)
+        raise ValueError("conversion failed")
+
+    with pytest.raises(ValueError, match="conversion failed"):
+        secret._request_stream("load_table", {"table": "t"}, write_body)
+
+    assert secret._conn is None
+    assert secret.get_secrets(["a"]) == {"a": "val-a"}